@@ -1,27 +1,36 @@
+import importlib
 import os
 from crewai import Agent
 from crewai.llms.base_llm import BaseLLM
-
-try:
-    from tools.google_gemini_adapter import GoogleGeminiAdapter
-except Exception:
-    GoogleGeminiAdapter = None
-
-try:
-    from tools.scraper_tool import WebsiteScraperTool
-except Exception as e:
-    print(f"Warning: Could not import WebsiteScraperTool: {e}")
-    WebsiteScraperTool = None
-
-try:
-    from tools.vision_tool import GeminiVisionTool
-except Exception as e:
-    print(f"Warning: Could not import GeminiVisionTool: {e}")
-    GeminiVisionTool = None
-
-
-def _get_gemini_llm():
-    """Create a Gemini LLM if ENABLE_LLM=1 and GOOGLE_API_KEY is set."""
+from model_router import ModelRouter, RoutedLLM
+
+# Optional classes are imported on first use so that heavy stacks (genai, PIL,
+# NumPy, Selenium) are only loaded when the step that needs them actually runs.
+_OPTIONAL_CLASSES = {
+    "GoogleGeminiAdapter": "tools.google_gemini_adapter",
+    "WebsiteScraperTool": "tools.scraper_tool",
+    "GeminiVisionTool": "tools.vision_tool",
+}
+_loaded_classes = {}
+
+
+def load_tool_class(name: str):
+    """Import and cache one of the optional tool/LLM classes; returns None if unavailable."""
+    if name not in _loaded_classes:
+        try:
+            module = importlib.import_module(_OPTIONAL_CLASSES[name])
+            _loaded_classes[name] = getattr(module, name)
+        except Exception as e:
+            print(f"Warning: Could not import {name}: {e}")
+            _loaded_classes[name] = None
+    return _loaded_classes[name]
+
+
+def _get_gemini_llm(router: ModelRouter | None = None):
+    """Create a Gemini LLM if ENABLE_LLM=1 and GOOGLE_API_KEY is set.
+
+    With a router, the returned LLM picks the model tier per task on every call.
+    """
     if os.getenv("ENABLE_LLM", "0").lower() not in ("1", "true", "yes"):
         print("LLM disabled (set ENABLE_LLM=1 to enable LLM calls).")
         return None
@@ -31,12 +40,21 @@ def _get_gemini_llm():
         print("No GOOGLE_API_KEY found in environment.")
         return None
 
+    GoogleGeminiAdapter = load_tool_class("GoogleGeminiAdapter")
     if GoogleGeminiAdapter is None:
         print("GoogleGeminiAdapter not available. Install google-generativeai package.")
         return None
 
     try:
-        llm = GoogleGeminiAdapter(api_key=api_key, model="gemini-pro")
+        if router is not None:
+            def llm_factory(model):
+                return GoogleGeminiAdapter(api_key=api_key, model=model)
+
+            llm = RoutedLLM(router, llm_factory)
+            # Instantiate the default tier up front so configuration errors surface here
+            llm._llm_for(router.default_tier)
+        else:
+            llm = GoogleGeminiAdapter(api_key=api_key, model="gemini-pro")
         print("✓ Gemini LLM initialized successfully")
         return llm
     except RuntimeError as e:
@@ -254,11 +272,17 @@ class NoOpLLM(BaseLLM):
 
 
 class CompetitorAnalysisAgents:
-    def web_recon_agent(self):
-        llm = _get_gemini_llm() or NoOpLLM()
+    def __init__(self, router: ModelRouter | None = None):
+        self.router = router
+
+    def web_recon_agent(self, fail_fast: bool = False):
+        """With `fail_fast`, a failed scrape aborts the crew with ToolExecutionFailedError."""
+        llm = _get_gemini_llm(self.router) or NoOpLLM()
         tools = []
+        WebsiteScraperTool = load_tool_class("WebsiteScraperTool")
         if WebsiteScraperTool is not None:
-            tools.append(WebsiteScraperTool())
+            options = {"raise_on_error": True, "tool_failure_policy": "raise"} if fail_fast else {}
+            tools.append(WebsiteScraperTool(**options))
         return Agent(
             role="Web Reconnaissance Specialist",
             goal="Scrape competitor websites.",
@@ -267,9 +291,10 @@ class CompetitorAnalysisAgents:
             llm=llm,
         )
 
-    def visual_brand_analyst_agent(self):
-        llm = _get_gemini_llm() or NoOpLLM()
+    def visual_brand_analyst_agent(self, with_tools: bool = True):
+        llm = _get_gemini_llm(self.router) or NoOpLLM()
         tools = []
+        GeminiVisionTool = load_tool_class("GeminiVisionTool") if with_tools else None
         if GeminiVisionTool is not None:
             tools.append(GeminiVisionTool())
         return Agent(
@@ -281,7 +306,7 @@ class CompetitorAnalysisAgents:
         )
 
     def content_strategist_agent(self):
-        llm = _get_gemini_llm() or NoOpLLM()
+        llm = _get_gemini_llm(self.router) or NoOpLLM()
         return Agent(
             role="Content Strategist",
             goal="Analyze text content from competitor websites.",
@@ -291,7 +316,7 @@ class CompetitorAnalysisAgents:
         )
 
     def strategic_insights_agent(self):
-        llm = _get_gemini_llm() or NoOpLLM()
+        llm = _get_gemini_llm(self.router) or NoOpLLM()
         return Agent(
             role="Strategic Insights Agent",
             goal="Synthesize all gathered data into a comprehensive report.",
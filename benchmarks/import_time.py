@@ -0,0 +1,112 @@
+# benchmarks/import_time.py
+"""Startup-time benchmark for the `main:app` entry point.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters, reports the
+cumulative import time and the heaviest modules, and fails when
+
+  - any of the heavy stacks in `DEFERRED_MODULES` is imported at startup (a
+    deterministic check: these are only needed once a job runs), or
+  - the fastest run regresses past the stored baseline. The minimum is the
+    least noisy estimate of the true cost, since interference only adds time.
+
+Usage:
+    python benchmarks/import_time.py                 # compare against baseline
+    python benchmarks/import_time.py --update        # record a new baseline
+    python benchmarks/import_time.py --runs 9 --top 15
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "import_time_baseline.json")
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+# Loaded lazily by the crew, tools and Redis queue; none may be pulled in by `import main`
+DEFERRED_MODULES = ("crewai", "google.generativeai", "PIL", "numpy", "redis", "selenium")
+
+
+def measure(module: str = "main") -> dict:
+    """Import `module` once in a subprocess and parse the -X importtime report (microseconds)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            modules[match[3]] = {"self_us": int(match[1]), "cumulative_us": int(match[2])}
+    # Interpreter startup imports (site, encodings, ...) are reported too; only count the entry point
+    return {"total_us": modules[module]["cumulative_us"], "modules": modules}
+
+
+def deferred_imports(modules: dict) -> list[str]:
+    """Modules from `DEFERRED_MODULES` (or their submodules) that were imported."""
+    return sorted(
+        name for name in modules
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in DEFERRED_MODULES)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to take the minimum over")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules to list")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--update", action="store_true", help="Write the result as the new baseline")
+    args = parser.parse_args()
+
+    results = [measure(args.module) for _ in range(args.runs)]
+    fastest = min(results, key=lambda r: r["total_us"])
+    total_ms = fastest["total_us"] / 1000
+    median_ms = statistics.median(r["total_us"] for r in results) / 1000
+    heaviest = sorted(fastest["modules"].items(), key=lambda kv: kv[1]["cumulative_us"], reverse=True)
+
+    print(f"import {args.module}: {total_ms:.1f} ms (min of {args.runs}, median {median_ms:.1f} ms)")
+    for name, timing in heaviest[: args.top]:
+        print(f"  {timing['cumulative_us'] / 1000:8.1f} ms  {name}")
+
+    deferred = deferred_imports(fastest["modules"])
+    if deferred:
+        print(f"✗ Heavy modules imported at startup: {', '.join(deferred)}")
+        return 1
+
+    if args.update:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_ms, 1),
+                "statistic": "min",
+                "python": sys.version.split()[0],
+                "runs": args.runs,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline recorded yet; run with --update to create one.")
+        return 0
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline_ms = json.load(f)["total_ms"]
+    limit_ms = baseline_ms * (1 + args.tolerance)
+    if total_ms > limit_ms:
+        print(f"✗ Import time regressed: {total_ms:.1f} ms > {limit_ms:.1f} ms (baseline {baseline_ms} ms)")
+        return 1
+    print(f"✓ Within budget: {total_ms:.1f} ms <= {limit_ms:.1f} ms (baseline {baseline_ms} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# benchmarks/structured_output.py
+"""Converter re-asks avoided by Gemini structured output.
+
+Runs the same analysis twice in this process, once with STRUCTURED_OUTPUT=0
+(prose + CrewAI converter) and once with structured output, and reports the
+converter re-ask LLM calls of each run. The difference is the number of
+re-asks structured output avoided. Needs GOOGLE_API_KEY and network access.
+
+Usage:
+    python benchmarks/structured_output.py --company OpenAI --url https://openai.com
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run(company: str, url: str, structured: bool) -> dict:
+    from crew import CompetitorAnalysisCrew
+    from tools.google_gemini_adapter import reset_structured_output_stats, structured_output_stats
+
+    os.environ["STRUCTURED_OUTPUT"] = "1" if structured else "0"
+    reset_structured_output_stats()
+    CompetitorAnalysisCrew().run(company, url)
+    return structured_output_stats()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--url", required=True)
+    args = parser.parse_args()
+
+    free_form = run(args.company, args.url, structured=False)
+    structured = run(args.company, args.url, structured=True)
+
+    print(f"STRUCTURED_OUTPUT=0: {free_form}")
+    print(f"STRUCTURED_OUTPUT=1: {structured}")
+    print(f"Converter re-asks avoided: {free_form['converter_reasks'] - structured['converter_reasks']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
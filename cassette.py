@@ -0,0 +1,276 @@
+# cassette.py (Record/replay of HTTP and Gemini traffic)
+"""Record real network exchanges once, then replay them offline.
+
+A cassette captures:
+  - every `requests` call (scraper pages, vision image downloads), and
+  - every Gemini round-trip made through `GoogleGeminiAdapter._generate`
+    and `GeminiVisionTool._generate`,
+into a gzip-compressed JSON-lines file. In replay mode the same calls are
+answered from the file in recorded order, optionally sleeping for the recorded
+latency, so full crew runs can be profiled without network access.
+
+Usage:
+    with Cassette("cassettes/openai.jsonl.gz", mode="record"):
+        CompetitorAnalysisCrew().run("OpenAI", "https://openai.com")
+
+or set CASSETTE_PATH / CASSETTE_MODE (record|replay) and CASSETTE_SIMULATE_LATENCY=1.
+
+Patching is process-wide: the first `with` installs the patches and the last
+one to exit removes them (and saves a recording). Concurrent runs (worker
+threads) share the same cassette; entering a different cassette while one is
+active raises `CassetteConflictError`. The on-disk vision cache is bypassed
+while a cassette is active, so every vision call is recorded and replayed.
+"""
+import base64
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODES = ("record", "replay")
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class CassetteConflictError(RuntimeError):
+    """Raised when a cassette is entered while a different one is active."""
+
+
+# The class-level patches are global, so only one cassette may be active at a time
+_activation_lock = threading.Lock()
+_active = None
+_active_depth = 0
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return h.hexdigest()[:24]
+
+
+def _http_key(method: str, url: str, kwargs: dict) -> str:
+    body = kwargs.get("data") or kwargs.get("json")
+    key = f"{method.upper()} {url}"
+    return f"{key} #{_digest(json.dumps(body, sort_keys=True, default=str))}" if body else key
+
+
+def _content_key(model_name: str, contents) -> str:
+    """Key an LLM call by model and prompt; images contribute their pixel bytes."""
+    parts = [model_name]
+    for item in contents if isinstance(contents, list) else [contents]:
+        parts.append(item.tobytes() if hasattr(item, "tobytes") else str(item))
+    return _digest(*parts)
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", simulate_latency: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self._lock = threading.Lock()
+        self._records = []
+        self._replay = defaultdict(deque)
+        self._last = {}
+        self._patches = []
+        if mode == "replay":
+            self._load()
+
+    # --- storage ---
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self._replay[(record["kind"], record["key"])].append(record)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8", compresslevel=9) as f:
+            for record in self._records:
+                f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        print(f"Cassette saved: {len(self._records)} exchanges -> {self.path}")
+
+    def _record(self, kind: str, key: str, elapsed: float, payload: dict) -> None:
+        with self._lock:
+            self._records.append({"kind": kind, "key": key, "elapsed": round(elapsed, 4), **payload})
+
+    def _play(self, kind: str, key: str) -> dict:
+        """Next recording for `key`; repeated calls beyond the recorded count reuse the last one."""
+        with self._lock:
+            queue = self._replay.get((kind, key))
+            if queue:
+                record = queue.popleft()
+                self._last[(kind, key)] = record
+            elif (kind, key) in self._last:
+                record = self._last[(kind, key)]
+            else:
+                raise CassetteMissError(f"No recorded {kind} exchange for {key}")
+        if self.simulate_latency:
+            time.sleep(record["elapsed"])
+        return record
+
+    # --- HTTP ---
+    @staticmethod
+    def _serialize_response(response: requests.Response) -> dict:
+        content = response.content or b""
+        try:
+            body = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"b64": base64.b64encode(content).decode("ascii")}
+        return {
+            "status": response.status_code,
+            "reason": response.reason,
+            "url": response.url,
+            "encoding": response.encoding,
+            "headers": dict(response.headers),
+            **body,
+        }
+
+    @staticmethod
+    def _build_response(record: dict, method: str, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record.get("reason")
+        response.url = record.get("url") or url
+        response.encoding = record.get("encoding")
+        response.headers = CaseInsensitiveDict(record.get("headers") or {})
+        # The body is stored decoded; drop transfer headers that no longer describe it
+        for header in ("Content-Encoding", "Transfer-Encoding", "Content-Length"):
+            response.headers.pop(header, None)
+        if "b64" in record:
+            response._content = base64.b64decode(record["b64"])
+        else:
+            response._content = record.get("text", "").encode("utf-8")
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+    def _wrap_http(self, original):
+        cassette = self
+
+        def request(session, method, url, **kwargs):
+            key = _http_key(method, url, kwargs)
+            if cassette.mode == "replay":
+                record = cassette._play("http", key)
+                if "error" in record:
+                    exc_type = getattr(requests.exceptions, record["error_type"], requests.exceptions.RequestException)
+                    raise exc_type(record["error"])
+                return cassette._build_response(record, method, url)
+
+            start = time.perf_counter()
+            try:
+                response = original(session, method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                cassette._record("http", key, time.perf_counter() - start,
+                                 {"error": str(e), "error_type": type(e).__name__})
+                raise
+            cassette._record("http", key, time.perf_counter() - start, cassette._serialize_response(response))
+            return response
+
+        return request
+
+    # --- LLM ---
+    def _wrap_llm(self, original, model_name, contents_of):
+        cassette = self
+
+        def generate(*args):
+            key = _content_key(model_name(*args), contents_of(*args))
+            if cassette.mode == "replay":
+                return cassette._play("llm", key)["text"]
+            start = time.perf_counter()
+            text = original(*args)
+            cassette._record("llm", key, time.perf_counter() - start, {"text": text})
+            return text
+
+        return generate
+
+    # --- patching ---
+    def _patch(self, owner, name, replacement) -> None:
+        self._patches.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, replacement)
+
+    def _install(self) -> None:
+        from tools import image_cache
+        from tools.google_gemini_adapter import GoogleGeminiAdapter
+        from tools.vision_tool import GeminiVisionTool
+
+        # A warm perceptual-hash cache would skip vision calls the recording needs (or
+        # contains), so cached analyses are bypassed for deterministic record/replay
+        self._patch(image_cache, "get_image_cache", lambda: None)
+
+        self._patch(requests.sessions.Session, "request", self._wrap_http(requests.sessions.Session.request))
+
+        adapter_generate = GoogleGeminiAdapter._generate
+        self._patch(GoogleGeminiAdapter, "_generate", self._wrap_llm(
+            adapter_generate,
+            model_name=lambda llm, prompt, config=None: f"{llm.model}|{getattr(config, 'response_schema', '')}",
+            contents_of=lambda llm, prompt, config=None: prompt,
+        ))
+
+        vision_generate = GeminiVisionTool._generate
+        self._patch(GeminiVisionTool, "_generate", staticmethod(self._wrap_llm(
+            vision_generate,
+            model_name=lambda model, contents: getattr(model, "model_name", "vision"),
+            contents_of=lambda model, contents: contents,
+        )))
+
+    def _uninstall(self) -> None:
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def __enter__(self) -> "Cassette":
+        global _active, _active_depth
+        with _activation_lock:
+            if _active is None:
+                self._install()
+                _active = self
+                print(f"Cassette {self.mode}: {self.path}")
+            elif _active is not self:
+                raise CassetteConflictError(
+                    f"Cassette {_active.path} is already active; cannot enter {self.path} concurrently"
+                )
+            _active_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        global _active, _active_depth
+        with _activation_lock:
+            _active_depth -= 1
+            if _active_depth:
+                return
+            self._uninstall()
+            _active = None
+            # Saved once, by the last run to leave, with every exchange recorded so far
+            if self.mode == "record":
+                self.save()
+
+
+_cassettes = {}
+
+
+def cassette_from_env():
+    """
+    The process-wide Cassette configured from CASSETTE_PATH / CASSETTE_MODE,
+    or a no-op context. Every run in the process gets the same instance.
+    """
+    path = os.getenv("CASSETTE_PATH")
+    if not path:
+        return contextlib.nullcontext()
+    mode = os.getenv("CASSETTE_MODE", "replay").lower()
+    simulate_latency = os.getenv("CASSETTE_SIMULATE_LATENCY", "0").lower() in ("1", "true", "yes")
+    with _activation_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None or (cassette.mode, cassette.simulate_latency) != (mode, simulate_latency):
+            cassette = _cassettes[path] = Cassette(path, mode=mode, simulate_latency=simulate_latency)
+        return cassette
@@ -1,9 +1,59 @@
 # crew.py (FINAL, FULLY INTEGRATED & OPTIMIZED)
 import os
+import time
 import traceback
 from crewai import Crew, Process
-from agents import CompetitorAnalysisAgents
+from crewai.tools.tool_failure import ToolExecutionFailedError
+from agents import CompetitorAnalysisAgents, load_tool_class
+from cassette import cassette_from_env
+from messaging_mapreduce import DEFAULT_CHUNK_CHARS, MessagingMapReduce
+from model_router import ModelRouter
 from tasks import CompetitorAnalysisTasks
+from tools.google_gemini_adapter import structured_output_stats
+
+
+# Purely mechanical steps that can bypass the LLM and call their tool directly.
+# Their output is injected into the downstream task descriptions instead.
+SUPPORTED_TOOL_ONLY_STEPS = ("scrape", "vision")
+
+
+class ScrapeFailedError(RuntimeError):
+    """Raised when the scrape fails, so no further LLM tasks are run on an empty page."""
+
+
+def _fast_fail_enabled() -> bool:
+    return os.getenv("SCRAPE_FAST_FAIL", "1").lower() in ("1", "true", "yes")
+
+
+def _mapreduce_enabled() -> bool:
+    return os.getenv("MESSAGING_MAPREDUCE", "1").lower() in ("1", "true", "yes")
+
+
+def _single_prompt_chars() -> int:
+    """Most scraped text sent to one prompt; same SCRAPER_MAX_CHARS cap the scraper tool applies."""
+    return int(os.getenv("SCRAPER_MAX_CHARS", "8000"))
+
+
+def _tool_only_steps() -> set[str]:
+    """Read TOOL_ONLY_STEPS (comma separated, default 'scrape'); 'none' disables the mode."""
+    raw = os.getenv("TOOL_ONLY_STEPS", "scrape").lower()
+    steps = {s.strip() for s in raw.split(",") if s.strip()}
+    return steps & set(SUPPORTED_TOOL_ONLY_STEPS)
+
+
+def report_to_dict(result) -> dict:
+    """Convert a crew result (CrewOutput, Pydantic model or dict) into a JSON-safe dict."""
+    if isinstance(result, dict):
+        return result
+    pydantic_output = getattr(result, "pydantic", None)
+    if pydantic_output is not None:
+        return pydantic_output.model_dump()
+    if hasattr(result, "model_dump"):
+        return result.model_dump()
+    json_output = getattr(result, "json_dict", None)
+    if json_output:
+        return json_output
+    return {"output": str(result)}
 
 
 class CompetitorAnalysisCrew:
@@ -19,44 +69,149 @@ class CompetitorAnalysisCrew:
     def __init__(self):
         try:
             # Instantiate all agents and tasks
-            self.agents = CompetitorAnalysisAgents()
-            self.tasks = CompetitorAnalysisTasks()
+            # One router per crew so escalations and tier metrics are scoped to this run
+            self.router = ModelRouter.from_env()
+            self.agents = CompetitorAnalysisAgents(self.router)
+            self.tasks = CompetitorAnalysisTasks(self.router)
+            self.tool_only_steps = _tool_only_steps()
+            self.tool_outputs = {}
+            self.last_error = None
 
             print("Agents and Tasks initialized successfully.")
         except Exception as e:
             print(f"Initialization error: {e}")
             traceback.print_exc()
 
+    def run_tool_step(self, step: str, tool_name: str, tool_options: dict | None = None, **kwargs):
+        """
+        Executes a mechanical step by calling its tool directly (no LLM round-trip).
+        `tool_options` configure the tool instance; `kwargs` are the tool arguments.
+        Returns the raw tool output, or an error dict if the tool is unavailable.
+        """
+        tool_cls = load_tool_class(tool_name)
+        if tool_cls is None:
+            output = {"error": f"Tool for step '{step}' is not available."}
+        else:
+            start = time.perf_counter()
+            try:
+                output = tool_cls(**(tool_options or {})).run(**kwargs)
+            except Exception as e:
+                output = {"error": str(e)}
+            print(f"Tool-only step '{step}' finished in {time.perf_counter() - start:.2f}s")
+
+        self.tool_outputs[step] = output
+        return output
+
+    def run_messaging_mapreduce(self, text: str, llm) -> str | None:
+        """
+        Runs the chunked map-reduce messaging analysis for pages too long for one
+        prompt. Returns None (falling back to the regular task) on failure.
+        """
+        try:
+            output = MessagingMapReduce(llm).run(text)
+        except Exception as e:
+            print(f"Map-reduce messaging analysis failed, using the messaging task instead: {e}")
+            return None
+        self.tool_outputs["messaging"] = output
+        return output
+
     def build_crew(self, company_name: str, company_url: str) -> Crew:
         """
         Assembles the complete crew pipeline for a given competitor website.
+        Steps listed in TOOL_ONLY_STEPS run their tool up front and are not
+        part of the crew; their output is injected into downstream tasks.
         """
         try:
-            # --- Initialize individual agents ---
-            web_recon = self.agents.web_recon_agent()
-            visual_analyst = self.agents.visual_brand_analyst_agent()
+            self.tool_outputs = {}
+            agents = []
+            tasks = []
+            visuals_context = ""
+            messaging_context = ""
+            profile_context = ""
+            scraped_text = ""
+
+            # --- Scrape: agent task or direct tool call ---
+            scrape_truncated = False
+            if "scrape" in self.tool_only_steps:
+                # Map-reduce takes the full page; otherwise the scraper applies its single-prompt cap
+                scraped = self.run_tool_step(
+                    "scrape",
+                    "WebsiteScraperTool",
+                    tool_options={"max_text_chars": 0} if _mapreduce_enabled() else None,
+                    url=company_url,
+                )
+                if isinstance(scraped, dict) and "error" not in scraped:
+                    scraped_text = scraped.get("text_content", "")
+                    scrape_truncated = bool(scraped.get("text_truncated"))
+                    visuals_context += self.tasks.format_tool_context(
+                        "scrape", {"hero_image_url": scraped.get("hero_image_url")}
+                    )
+                elif _fast_fail_enabled():
+                    # Nothing downstream can produce a meaningful report without the page
+                    error = scraped.get("error") if isinstance(scraped, dict) else scraped
+                    raise ScrapeFailedError(f"Scraping {company_url} failed: {error}")
+                else:
+                    messaging_context += self.tasks.format_tool_context("scrape", scraped)
+
+                # Vision only makes sense as a tool-only step once the page images are known
+                hero_image_url = scraped.get("hero_image_url") if isinstance(scraped, dict) else None
+                if "vision" in self.tool_only_steps and hero_image_url:
+                    vision = self.run_tool_step(
+                        "vision",
+                        "GeminiVisionTool",
+                        image_url=hero_image_url,
+                        image_candidates=scraped.get("image_candidates") or None,
+                    )
+                    visuals_context += self.tasks.format_tool_context("vision", vision)
+            else:
+                web_recon = self.agents.web_recon_agent(fail_fast=_fast_fail_enabled())
+                agents.append(web_recon)
+                tasks.append(self.tasks.scrape_website_task(web_recon, company_url))
+
+            # --- Initialize LLM-backed agents ---
+            # Without tools the analyst can use schema-constrained generation
+            visual_analyst = self.agents.visual_brand_analyst_agent(
+                with_tools="vision" not in self.tool_outputs
+            )
             content_strategist = self.agents.content_strategist_agent()
             strategist = self.agents.strategic_insights_agent()
 
+            # --- Messaging: long pages go through map-reduce instead of one huge prompt ---
+            messaging = None
+            chunk_chars = int(os.getenv("MESSAGING_CHUNK_CHARS", str(DEFAULT_CHUNK_CHARS)))
+            if _mapreduce_enabled() and len(scraped_text) > chunk_chars:
+                messaging = self.run_messaging_mapreduce(scraped_text, content_strategist.llm)
+            if messaging is None and scraped_text:
+                # Single-prompt fallback stays bounded, and says so when it had to cut the page
+                max_chars = _single_prompt_chars()
+                if max_chars and len(scraped_text) > max_chars:
+                    scraped_text, scrape_truncated = scraped_text[:max_chars], True
+                scrape_context = {"text_content": scraped_text}
+                if scrape_truncated:
+                    scrape_context["text_truncated"] = True
+                    scrape_context["note"] = "The page text was truncated; analyze only what is shown."
+                messaging_context += self.tasks.format_tool_context("scrape", scrape_context)
+
             # --- Define task flow ---
-            scrape_task = self.tasks.scrape_website_task(web_recon, company_url)
-            analyze_visuals_task = self.tasks.analyze_visuals_task(visual_analyst)
-            analyze_messaging_task = self.tasks.analyze_messaging_task(content_strategist)
-            compile_profile_task = self.tasks.compile_profile_task(
-                strategist, company_name, company_url
+            agents.append(visual_analyst)
+            tasks.append(self.tasks.analyze_visuals_task(visual_analyst, visuals_context))
+            if messaging is None:
+                agents.append(content_strategist)
+                tasks.append(self.tasks.analyze_messaging_task(content_strategist, messaging_context))
+            else:
+                profile_context += self.tasks.format_tool_context("messaging", messaging)
+            agents.append(strategist)
+            tasks.extend(
+                [
+                    self.tasks.compile_profile_task(strategist, company_name, company_url, profile_context),
+                    self.tasks.generate_report_task(strategist),
+                ]
             )
-            report_task = self.tasks.generate_report_task(strategist)
 
             # --- Create Crew ---
             crew = Crew(
-                agents=[web_recon, visual_analyst, content_strategist, strategist],
-                tasks=[
-                    scrape_task,
-                    analyze_visuals_task,
-                    analyze_messaging_task,
-                    compile_profile_task,
-                    report_task,
-                ],
+                agents=agents,
+                tasks=tasks,
                 process=Process.sequential,  # Each agent runs in order
                 verbose=True,
             )
@@ -64,6 +219,9 @@ class CompetitorAnalysisCrew:
             print(f"Crew for {company_name} built successfully.")
             return crew
 
+        except ScrapeFailedError:
+            raise
+
         except Exception as e:
             print(f"Crew build error: {e}")
             traceback.print_exc()
@@ -73,19 +231,35 @@ class CompetitorAnalysisCrew:
         """
         Executes the end-to-end competitor analysis pipeline.
         Returns the final StrategicReport object.
+        With CASSETTE_PATH set, HTTP and Gemini traffic is recorded or replayed.
         """
         try:
-            crew = self.build_crew(company_name, company_url)
-            print(f"Running CrewAI pipeline for {company_name} ...\n")
+            with cassette_from_env():
+                crew = self.build_crew(company_name, company_url)
+                print(f"Running CrewAI pipeline for {company_name} ...\n")
 
-            result = crew.kickoff()
+                try:
+                    result = crew.kickoff()
+                except ToolExecutionFailedError as e:
+                    # The agent-driven scrape failed under SCRAPE_FAST_FAIL; other tools only warn
+                    if e.record.tool_name != "website_scraper":
+                        raise
+                    raise ScrapeFailedError(f"Scraping {company_url} failed: {e.record.message}") from e
 
             print("\nCrew Execution Completed Successfully.")
+            print(f"Model tier usage: {self.router.stats()}")
+            print(f"Structured output: {structured_output_stats()}")
             return result
 
+        except ScrapeFailedError as e:
+            print(f"Skipping LLM tasks: {e}")
+            self.last_error = e
+            return None
+
         except Exception as e:
             print(f"Crew execution failed: {e}")
             traceback.print_exc()
+            self.last_error = e
             return None
 
 
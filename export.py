@@ -0,0 +1,229 @@
+# export.py (Bulk streaming export of stored reports)
+"""Stream stored reports as compressed NDJSON or Parquet with constant memory.
+
+Records flow through a generator pipeline (store cursor -> flatten -> serialize
+-> compress), so an export of any size never holds more than one batch.
+
+Kinds:
+    reports   one row per StrategicReport (profiles kept as a JSON string)
+    profiles  one row per CompetitorProfile, BrandAnalysis flattened into visual_* columns
+
+Usage:
+    python export.py --kind profiles --format parquet --out profiles.parquet
+    python export.py --kind reports --format ndjson --compression zstd --out reports.ndjson.zst
+"""
+import argparse
+import json
+import sys
+import zlib
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+from report_store import ReportStore, get_report_store
+
+KINDS = ("reports", "profiles")
+FORMATS = ("ndjson", "parquet")
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+REPORT_TEXT_FIELDS = ("report_title", "comparative_summary", "identified_gaps_and_opportunities", "strategic_recommendations")
+VISUAL_FIELDS = ("primary_colors", "secondary_colors", "design_style", "emotional_tone", "logo_analysis")
+
+
+def dumps(obj) -> bytes:
+    """Fast JSON serialization: orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_records(kind: str, store: ReportStore | None = None, since: float | None = None):
+    store = store or get_report_store()
+    for stored in store.iter_reports(since=since):
+        report = stored["report"]
+        base = {
+            "report_id": stored["id"],
+            "created_at": stored["created_at"],
+            "requested_company": stored["company_name"],
+            "requested_url": stored["company_url"],
+        }
+        if kind == "reports":
+            yield {
+                **base,
+                **{field: report.get(field) for field in REPORT_TEXT_FIELDS},
+                "competitor_profiles": dumps(report.get("competitor_profiles", [])).decode("utf-8"),
+            }
+            continue
+
+        for profile in report.get("competitor_profiles", []) or []:
+            visual = profile.get("visual_analysis") or {}
+            yield {
+                **base,
+                "company_name": profile.get("company_name"),
+                "url": profile.get("url"),
+                "messaging_analysis": profile.get("messaging_analysis"),
+                **{f"visual_{field}": visual.get(field) for field in VISUAL_FIELDS},
+            }
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield dumps(record) + b"\n"
+
+
+def compress(chunks, codec: str, batch_bytes: int = 1 << 16):
+    """Compress a byte stream incrementally, buffering up to `batch_bytes` before each write."""
+    if codec == "none":
+        yield from chunks
+        return
+    if codec == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    elif codec == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd export requires the `zstandard` package") from e
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        raise ValueError(f"Unsupported compression: {codec}")
+
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= batch_bytes:
+            out = compressor.compress(bytes(buffer))
+            buffer.clear()
+            if out:
+                yield out
+    out = compressor.compress(bytes(buffer)) + compressor.flush()
+    if out:
+        yield out
+
+
+class _DrainableSink:
+    """Write-only file object whose contents are handed out and released after each row group."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_parquet(records, kind: str, compression: str = "zstd", batch_size: int = 1000):
+    """Yield a Parquet file in pieces, one row group per `batch_size` records."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires the `pyarrow` package") from e
+
+    common = [
+        ("report_id", pa.string()),
+        ("created_at", pa.float64()),
+        ("requested_company", pa.string()),
+        ("requested_url", pa.string()),
+    ]
+    if kind == "reports":
+        fields = common + [(f, pa.string()) for f in REPORT_TEXT_FIELDS] + [("competitor_profiles", pa.string())]
+    else:
+        fields = common + [
+            ("company_name", pa.string()),
+            ("url", pa.string()),
+            ("messaging_analysis", pa.string()),
+            ("visual_primary_colors", pa.list_(pa.string())),
+            ("visual_secondary_colors", pa.list_(pa.string())),
+            ("visual_design_style", pa.string()),
+            ("visual_emotional_tone", pa.string()),
+            ("visual_logo_analysis", pa.string()),
+        ]
+    schema = pa.schema(fields)
+
+    sink = _DrainableSink()
+    parquet_codec = None if compression == "none" else compression
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression=parquet_codec) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    yield sink.drain()
+
+
+def export_stream(kind: str = "profiles", fmt: str = "ndjson", compression: str = "gzip",
+                  since: float | None = None, store: ReportStore | None = None):
+    """The full export pipeline as an iterator of bytes."""
+    if kind not in KINDS or fmt not in FORMATS or compression not in COMPRESSIONS:
+        raise ValueError(f"kind must be one of {KINDS}, format one of {FORMATS}, compression one of {COMPRESSIONS}")
+    # Check optional dependencies up front; the generators below only fail once iterated
+    required = "pyarrow" if fmt == "parquet" else "zstandard" if compression == "zstd" else None
+    if required:
+        try:
+            __import__(required)
+        except ImportError as e:
+            raise RuntimeError(f"{fmt}/{compression} export requires the `{required}` package") from e
+    records = iter_records(kind, store=store, since=since)
+    if fmt == "parquet":
+        # Parquet compresses per column internally
+        return iter_parquet(records, kind, compression=compression)
+    return compress(iter_ndjson(records), compression)
+
+
+def export_filename(kind: str, fmt: str, compression: str) -> str:
+    if fmt == "parquet":
+        return f"{kind}.parquet"
+    suffix = {"gzip": ".gz", "zstd": ".zst", "none": ""}[compression]
+    return f"{kind}.ndjson{suffix}"
+
+
+def export_media_type(fmt: str, compression: str) -> str:
+    if fmt == "parquet":
+        return "application/vnd.apache.parquet"
+    return {"gzip": "application/gzip", "zstd": "application/zstd", "none": "application/x-ndjson"}[compression]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=KINDS, default="profiles")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="gzip")
+    parser.add_argument("--since", type=float, default=None, help="Only reports created at/after this Unix time")
+    parser.add_argument("--store", default=None, help="Report store path (default: REPORT_STORE_PATH)")
+    parser.add_argument("--out", default="-", help="Output file, or '-' for stdout")
+    args = parser.parse_args()
+
+    stream = export_stream(args.kind, args.format, args.compression, args.since, get_report_store(args.store))
+    out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        written = 0
+        for piece in stream:
+            out.write(piece)
+            written += len(piece)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"Exported {args.kind} as {export_filename(args.kind, args.format, args.compression)} ({written} bytes)", file=sys.stderr)
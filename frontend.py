@@ -1,11 +1,18 @@
 # app.py (Streamlit Frontend for Competitor Intelligence Engine)
+import os
+import time
+import uuid
+
 import streamlit as st
 import requests
-from PIL import Image
-from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ✅ FastAPI backend URL
-API_URL = "http://localhost:8000/analyze_competitor"
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000").rstrip("/")
+POLL_INTERVAL = float(os.getenv("FRONTEND_POLL_INTERVAL", "2"))
+REPORT_CACHE_TTL = int(os.getenv("FRONTEND_REPORT_TTL", "3600"))
+PROFILES_PER_PAGE = 5
 
 # 🎨 Streamlit page configuration
 st.set_page_config(
@@ -15,6 +22,67 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+
+# --- Backend Access ---
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled session per server process, with retry/backoff for transient errors."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=10, pool_maxsize=20)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def job_index() -> dict:
+    """(company, url) -> job id, shared by all sessions so concurrent users reuse one analysis."""
+    return {}
+
+
+def report_key(company_name: str, company_url: str) -> tuple[str, str]:
+    return company_name.strip().lower(), company_url.strip().rstrip("/").lower()
+
+
+def submit_job(company_name: str, company_url: str, idempotency_key: str) -> str:
+    response = get_session().post(
+        f"{API_BASE_URL}/jobs",
+        json={"company_name": company_name, "company_url": company_url},
+        headers={"Idempotency-Key": idempotency_key},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()["job_id"]
+
+
+def get_job(job_id: str) -> dict:
+    response = get_session().get(f"{API_BASE_URL}/jobs/{job_id}", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL, show_spinner=False)
+def fetch_report(company_key: str, url_key: str, job_id: str) -> dict:
+    """Finished reports never change, so they are cached per company and URL."""
+    job = get_job(job_id)
+    if job["status"] != "done":
+        raise RuntimeError(f"Job {job_id} is {job['status']}")
+    return job["report"]
+
+
+def show_backend_error(e: Exception) -> None:
+    if isinstance(e, requests.exceptions.ConnectionError):
+        st.error(
+            f"🚨 Could not connect to the backend at {API_BASE_URL}.\n"
+            "Make sure the FastAPI server is running (run `python main.py` or `uvicorn main:app --reload --port 8000`)"
+        )
+    elif isinstance(e, requests.exceptions.Timeout):
+        st.error("🚨 Request timed out. The backend might be busy. Try again in a moment.")
+    else:
+        st.error(f"🚨 Unexpected Error: {e}")
+
+
 # --- Sidebar Section ---
 st.sidebar.title("⚙️ Configuration")
 st.sidebar.info(
@@ -44,95 +112,144 @@ with col1:
 with col2:
     company_url = st.text_input("**Website URL**", placeholder="e.g., https://openai.com")
 
+refresh = st.checkbox("Ignore cached report and re-run the analysis", value=False)
 analyze_btn = st.button("🚀 Start Analysis", use_container_width=True)
 
-# --- On Button Click ---
+# --- On Button Click: submit, then poll ---
 if analyze_btn:
     if not company_name or not company_url:
         st.warning("⚠️ Please enter both company name and website URL.")
     else:
-        with st.spinner("⏳ Running full competitor analysis using CrewAI agents..."):
-            try:
-                # Simple retry/backoff for transient connection errors
-                from requests.adapters import HTTPAdapter
-                from urllib3.util.retry import Retry
-
-                session = requests.Session()
-                retries = Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504])
-                session.mount("http://", HTTPAdapter(max_retries=retries))
-
-                response = session.post(API_URL, json={"company_name": company_name, "company_url": company_url}, timeout=30)
-                if response.status_code == 200:
-                    result = response.json()
-
-                    if result["status"] == "success":
-                        st.success(f"✅ Analysis Completed: {company_name}")
-                        report = result["report"]
-
-                        # --- Display Structured Report ---
-                        st.markdown("## 📊 Strategic Report Summary")
-                        st.markdown(f"**{report.get('report_title', 'Untitled Report')}**")
-                        st.markdown(f"_{report.get('comparative_summary', 'No summary available.')}_")
-
-                        st.markdown("### 🧩 Identified Gaps & Opportunities")
-                        st.info(report.get("identified_gaps_and_opportunities", "N/A"))
-
-                        st.markdown("### 🎯 Strategic Recommendations")
-                        st.success(report.get("strategic_recommendations", "N/A"))
-
-                        # --- Competitor Profiles Section ---
-                        st.markdown("---")
-                        st.markdown("## 🏢 Competitor Profiles")
-
-                        competitors = report.get("competitor_profiles", [])
-                        for comp in competitors:
-                            with st.expander(f"**{comp['company_name']}** ({comp['url']})", expanded=False):
-                                st.markdown("#### 🗣 Messaging Analysis")
-                                st.write(comp.get("messaging_analysis", "N/A"))
-
-                                visual = comp.get("visual_analysis", {})
-                                st.markdown("#### 🎨 Visual Brand Analysis")
-
-                                # Display colors beautifully
-                                primary_colors = visual.get("primary_colors", [])
-                                secondary_colors = visual.get("secondary_colors", [])
-                                if primary_colors:
-                                    st.write("**Primary Colors:**")
-                                    cols = st.columns(len(primary_colors))
-                                    for i, color in enumerate(primary_colors):
-                                        cols[i].markdown(
-                                            f"<div style='background-color:{color}; width:100%; height:40px; border-radius:5px;'></div>",
-                                            unsafe_allow_html=True,
-                                        )
-
-                                if secondary_colors:
-                                    st.write("**Secondary Colors:**")
-                                    cols = st.columns(len(secondary_colors))
-                                    for i, color in enumerate(secondary_colors):
-                                        cols[i].markdown(
-                                            f"<div style='background-color:{color}; width:100%; height:40px; border-radius:5px;'></div>",
-                                            unsafe_allow_html=True,
-                                        )
-
-                                st.markdown("**Design Style:** " + visual.get("design_style", "N/A"))
-                                st.markdown("**Emotional Tone:** " + visual.get("emotional_tone", "N/A"))
-                                st.markdown("**Logo Analysis:** " + visual.get("logo_analysis", "N/A"))
-
-                    else:
-                        st.error(result.get("message", "Failed to generate report."))
-
-                else:
-                    st.error(f"❌ API Error {response.status_code}: {response.text}")
-
-            except requests.exceptions.ConnectionError:
-                st.error(
-                    "🚨 Could not connect to the backend at http://localhost:8000.\n"
-                    "Make sure the FastAPI server is running (run `python main.py` or `uvicorn main:app --reload --port 8000`)"
-                )
-            except requests.exceptions.Timeout:
-                st.error("🚨 Request timed out. The backend might be busy. Try again or increase the timeout.")
-            except Exception as e:
-                st.error(f"🚨 Unexpected Error: {e}")
+        key = report_key(company_name, company_url)
+        try:
+            job_id = None if refresh else job_index().get(key)
+            if job_id is not None:
+                # Reuse a running or finished job for the same competitor, but not a failed/unknown one
+                try:
+                    if get_job(job_id)["status"] == "failed":
+                        job_id = None
+                except requests.exceptions.HTTPError:
+                    job_id = None
+            if job_id is None:
+                job_id = submit_job(company_name.strip(), company_url.strip(), uuid.uuid4().hex)
+                job_index()[key] = job_id
+            st.session_state["active_job"] = {"id": job_id, "key": key, "company_name": company_name}
+            st.session_state["report_page"] = 1
+        except Exception as e:
+            show_backend_error(e)
+
+
+def render_job_status() -> None:
+    """Polls the active job; triggers a full rerun once the report is ready."""
+    job = st.session_state.get("active_job")
+    if not job:
+        return
+    try:
+        status = get_job(job["id"])
+    except Exception as e:
+        show_backend_error(e)
+        return
+
+    if status["status"] == "done":
+        st.session_state["shown_report"] = {**job}
+        del st.session_state["active_job"]
+        st.rerun()
+    elif status["status"] == "failed":
+        del st.session_state["active_job"]
+        st.session_state["job_error"] = status.get("error") or "unknown error"
+        st.rerun()
+    else:
+        st.info(
+            f"⏳ Analysis for {job['company_name']} is {status['status']} "
+            f"(attempt {status.get('attempts', 0)}). This page updates automatically."
+        )
+
+
+if "job_error" in st.session_state:
+    st.error(f"❌ Analysis failed: {st.session_state.pop('job_error')}")
+
+if "active_job" in st.session_state:
+    if hasattr(st, "fragment"):
+        # Only this fragment reruns while polling; the rest of the page stays interactive
+        st.fragment(run_every=POLL_INTERVAL)(render_job_status)()
+    else:
+        render_job_status()
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+
+
+show_details = st.toggle if hasattr(st, "toggle") else st.checkbox
+
+
+def swatches(colors: list[str]) -> str:
+    """All swatches of a palette as one HTML element instead of one column per color."""
+    cells = "".join(
+        f"<div style='background-color:{color}; flex:1; height:40px; border-radius:5px;' title='{color}'></div>"
+        for color in colors
+    )
+    return f"<div style='display:flex; gap:8px;'>{cells}</div>"
+
+
+def render_profile(comp: dict) -> None:
+    st.markdown("#### 🗣 Messaging Analysis")
+    st.write(comp.get("messaging_analysis", "N/A"))
+
+    visual = comp.get("visual_analysis", {})
+    st.markdown("#### 🎨 Visual Brand Analysis")
+
+    primary_colors = visual.get("primary_colors", [])
+    secondary_colors = visual.get("secondary_colors", [])
+    if primary_colors:
+        st.write("**Primary Colors:**")
+        st.markdown(swatches(primary_colors), unsafe_allow_html=True)
+    if secondary_colors:
+        st.write("**Secondary Colors:**")
+        st.markdown(swatches(secondary_colors), unsafe_allow_html=True)
+
+    st.markdown("**Design Style:** " + visual.get("design_style", "N/A"))
+    st.markdown("**Emotional Tone:** " + visual.get("emotional_tone", "N/A"))
+    st.markdown("**Logo Analysis:** " + visual.get("logo_analysis", "N/A"))
+
+
+# --- Display Structured Report ---
+shown = st.session_state.get("shown_report")
+if shown:
+    try:
+        report = fetch_report(shown["key"][0], shown["key"][1], shown["id"])
+    except Exception as e:
+        report = None
+        show_backend_error(e)
+
+    if report:
+        st.success(f"✅ Analysis Completed: {shown['company_name']}")
+
+        st.markdown("## 📊 Strategic Report Summary")
+        st.markdown(f"**{report.get('report_title', 'Untitled Report')}**")
+        st.markdown(f"_{report.get('comparative_summary', 'No summary available.')}_")
+
+        st.markdown("### 🧩 Identified Gaps & Opportunities")
+        st.info(report.get("identified_gaps_and_opportunities", "N/A"))
+
+        st.markdown("### 🎯 Strategic Recommendations")
+        st.success(report.get("strategic_recommendations", "N/A"))
+
+        # --- Competitor Profiles Section (paginated; only the open expander renders its details) ---
+        st.markdown("---")
+        st.markdown("## 🏢 Competitor Profiles")
+
+        competitors = report.get("competitor_profiles", [])
+        pages = max(1, -(-len(competitors) // PROFILES_PER_PAGE))
+        page = 1
+        if pages > 1:
+            page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="report_page")
+        start = (page - 1) * PROFILES_PER_PAGE
+
+        for index, comp in enumerate(competitors[start:start + PROFILES_PER_PAGE], start=start):
+            label = f"**{comp.get('company_name', 'Unknown')}** ({comp.get('url', '')})"
+            with st.expander(label, expanded=False):
+                # Expander bodies are always built, so details render only on demand
+                if show_details("Show details", key=f"profile_{shown['id']}_{index}"):
+                    render_profile(comp)
 
 # --- Footer ---
 st.markdown("---")
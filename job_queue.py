@@ -0,0 +1,345 @@
+# job_queue.py (Pluggable job queue for distributed analysis workers)
+"""Queue backends shared by the API (producer) and `worker.py` (consumers).
+
+Semantics are the same for every backend:
+  - at-least-once delivery: a claimed job is hidden for `visibility_timeout`
+    seconds; if its worker stops heartbeating it becomes claimable again,
+  - idempotency keys: enqueueing the same key twice returns the original job,
+    and only the first completion of a job is stored,
+  - jobs that fail `max_attempts` times are marked failed for good.
+
+Select a backend with JOB_QUEUE_URL:
+    sqlite:///.data/jobs.db         (default; single machine)
+    redis://localhost:6379/0        (requires the `redis` package)
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+DEFAULT_QUEUE_URL = "sqlite:///.data/jobs.db"
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class JobQueue(ABC):
+    """Interface implemented by every queue backend."""
+
+    @abstractmethod
+    def enqueue(self, payload: dict, idempotency_key: str | None = None) -> str:
+        """Queue a job and return its id, or the existing job's id for a known idempotency key."""
+
+    @abstractmethod
+    def claim(self, worker_id: str, visibility_timeout: float) -> dict | None:
+        """Lease the oldest visible job; returns {'id', 'payload', 'attempts'} or None."""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        """Extend the lease; False if the job was re-leased to another worker or finished."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: dict) -> bool:
+        """Store the result unless the job already completed; True if this call stored it."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Release the lease so the job is retried, or mark it failed after max attempts."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict | None:
+        """The job's row as a dict (payload and result decoded), or None if unknown."""
+
+
+class SQLiteJobQueue(JobQueue):
+    def __init__(self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    visible_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    heartbeat_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_visible ON jobs (status, visible_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the queue safe across threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, payload: dict, idempotency_key: str | None = None) -> str:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if idempotency_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row:
+                    conn.execute("COMMIT")
+                    return row["id"]
+            conn.execute(
+                "INSERT INTO jobs (id, idempotency_key, payload, status, visible_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, idempotency_key, json.dumps(payload), now, now, now),
+            )
+            conn.execute("COMMIT")
+            return job_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, worker_id: str, visibility_timeout: float) -> dict | None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases on jobs that exhausted their attempts are not retried again
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, updated_at = ?, "
+                "error = COALESCE(error, 'Lease expired after max attempts') "
+                "WHERE status = 'running' AND visible_at <= ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs "
+                "WHERE status IN ('queued', 'running') AND visible_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "visible_at = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + visibility_timeout, now, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            return {"id": row["id"], "payload": json.loads(row["payload"]), "attempts": row["attempts"] + 1}
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        now = time.time()
+        with contextlib.closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET visible_at = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now + visibility_timeout, now, now, job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict) -> bool:
+        now = time.time()
+        with contextlib.closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status != 'done'",
+                (json.dumps(result), now, job_id),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        now = time.time()
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = ?, lease_owner = NULL, visible_at = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (self.max_attempts, error, now, now, job_id, worker_id),
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+# Redis layout (all keys under `prefix`):
+#   job:<id>     hash with the same fields as the SQLite table
+#   pending      sorted set of unfinished job ids scored by visible_at
+#   idem:<key>   job id for an idempotency key
+# Every multi-key change runs as one Lua script, so it is atomic.
+_REDIS_ENQUEUE = """
+if KEYS[3] then
+  local existing = redis.call('GET', KEYS[3])
+  if existing then return existing end
+  redis.call('SET', KEYS[3], ARGV[1])
+end
+redis.call('HSET', KEYS[2], 'id', ARGV[1], 'idempotency_key', ARGV[2], 'payload', ARGV[3],
+           'status', 'queued', 'attempts', 0, 'created_at', ARGV[4], 'updated_at', ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+return ARGV[1]
+"""
+
+_REDIS_CLAIM = """
+local now = tonumber(ARGV[1])
+while true do
+  local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 1)
+  if #ids == 0 then return nil end
+  local id = ids[1]
+  local key = ARGV[5] .. 'job:' .. id
+  local attempts = tonumber(redis.call('HGET', key, 'attempts') or '0')
+  if attempts >= tonumber(ARGV[4]) then
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HSET', key, 'status', 'failed', 'updated_at', now)
+    if not redis.call('HGET', key, 'error') then
+      redis.call('HSET', key, 'error', 'Lease expired after max attempts')
+    end
+  else
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), id)
+    redis.call('HINCRBY', key, 'attempts', 1)
+    redis.call('HSET', key, 'status', 'running', 'lease_owner', ARGV[2], 'heartbeat_at', now, 'updated_at', now)
+    return {id, redis.call('HGET', key, 'payload'), attempts + 1}
+  end
+end
+"""
+
+_REDIS_HEARTBEAT = """
+if redis.call('HGET', KEYS[2], 'lease_owner') ~= ARGV[1] or redis.call('HGET', KEYS[2], 'status') ~= 'running' then
+  return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', tonumber(ARGV[2]) + tonumber(ARGV[3]), ARGV[4])
+redis.call('HSET', KEYS[2], 'heartbeat_at', ARGV[2], 'updated_at', ARGV[2])
+return 1
+"""
+
+_REDIS_COMPLETE = """
+if redis.call('HGET', KEYS[2], 'status') == 'done' then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[2], 'status', 'done', 'result', ARGV[2], 'lease_owner', '', 'updated_at', ARGV[3])
+redis.call('HDEL', KEYS[2], 'error')
+return 1
+"""
+
+_REDIS_FAIL = """
+if redis.call('HGET', KEYS[2], 'lease_owner') ~= ARGV[1] or redis.call('HGET', KEYS[2], 'status') ~= 'running' then
+  return 0
+end
+redis.call('HSET', KEYS[2], 'error', ARGV[3], 'lease_owner', '', 'updated_at', ARGV[4])
+if tonumber(redis.call('HGET', KEYS[2], 'attempts')) >= tonumber(ARGV[5]) then
+  redis.call('ZREM', KEYS[1], ARGV[2])
+  redis.call('HSET', KEYS[2], 'status', 'failed')
+else
+  redis.call('ZADD', KEYS[1], ARGV[4], ARGV[2])
+  redis.call('HSET', KEYS[2], 'status', 'queued')
+end
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    def __init__(self, url: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, prefix: str = "ci:"):
+        # Imported here so the default SQLite deployment never pays for the Redis client
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("redis library not installed") from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+        self.pending_key = f"{prefix}pending"
+        self._enqueue = self.client.register_script(_REDIS_ENQUEUE)
+        self._claim = self.client.register_script(_REDIS_CLAIM)
+        self._heartbeat = self.client.register_script(_REDIS_HEARTBEAT)
+        self._complete = self.client.register_script(_REDIS_COMPLETE)
+        self._fail = self.client.register_script(_REDIS_FAIL)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def enqueue(self, payload: dict, idempotency_key: str | None = None) -> str:
+        job_id = uuid.uuid4().hex
+        keys = [self.pending_key, self._job_key(job_id)]
+        if idempotency_key:
+            keys.append(f"{self.prefix}idem:{idempotency_key}")
+        return self._enqueue(keys=keys, args=[job_id, idempotency_key or "", json.dumps(payload), time.time()])
+
+    def claim(self, worker_id: str, visibility_timeout: float) -> dict | None:
+        claimed = self._claim(
+            keys=[self.pending_key],
+            args=[time.time(), worker_id, visibility_timeout, self.max_attempts, self.prefix],
+        )
+        if not claimed:
+            return None
+        job_id, payload, attempts = claimed
+        return {"id": job_id, "payload": json.loads(payload), "attempts": int(attempts)}
+
+    def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        return bool(self._heartbeat(
+            keys=[self.pending_key, self._job_key(job_id)],
+            args=[worker_id, time.time(), visibility_timeout, job_id],
+        ))
+
+    def complete(self, job_id: str, worker_id: str, result: dict) -> bool:
+        return bool(self._complete(
+            keys=[self.pending_key, self._job_key(job_id)],
+            args=[job_id, json.dumps(result), time.time()],
+        ))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        self._fail(
+            keys=[self.pending_key, self._job_key(job_id)],
+            args=[worker_id, job_id, error, time.time(), self.max_attempts],
+        )
+
+    def get(self, job_id: str) -> dict | None:
+        job = self.client.hgetall(self._job_key(job_id))
+        if not job:
+            return None
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        job["attempts"] = int(job.get("attempts", 0))
+        return job
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_job_queue(url: str | None = None) -> JobQueue:
+    """Process-wide queue for JOB_QUEUE_URL (or `url`)."""
+    url = url or os.getenv("JOB_QUEUE_URL", DEFAULT_QUEUE_URL)
+    max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS)))
+    with _queues_lock:
+        if url not in _queues:
+            if url.startswith("sqlite:///"):
+                _queues[url] = SQLiteJobQueue(url[len("sqlite:///"):], max_attempts=max_attempts)
+            elif url.startswith(("redis://", "rediss://", "unix://")):
+                _queues[url] = RedisJobQueue(url, max_attempts=max_attempts)
+            else:
+                raise ValueError(f"Unsupported JOB_QUEUE_URL: {url}")
+        return _queues[url]
@@ -1,11 +1,21 @@
 # main.py (COMPLETE FASTAPI BACKEND)
+import contextlib
 import os
 import traceback
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from crew import CompetitorAnalysisCrew
 from fastapi.middleware.cors import CORSMiddleware
 import sys
+from job_queue import SQLiteJobQueue, get_job_queue
+from report_store import get_report_store
+
+# orjson serializes responses several times faster than the stdlib encoder
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 
 # Ensure stdout/stderr are UTF-8 on Windows so emoji/log messages don't raise encoding errors
 if sys.stdout.encoding is None or sys.stdout.encoding.lower() != "utf-8":
@@ -15,11 +25,35 @@ if sys.stdout.encoding is None or sys.stdout.encoding.lower() != "utf-8":
         # reconfigure may not be available in older Pythons; ignore if it fails
         pass
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run worker threads inside the API process. Defaults to one thread with the
+    single-machine SQLite queue and none otherwise, so scaled-out deployments keep
+    the API tier thin and run `python worker.py` on separate nodes.
+    """
+    queue = get_job_queue()
+    default = "1" if isinstance(queue, SQLiteJobQueue) else "0"
+    count = int(os.getenv("API_INLINE_WORKERS", default))
+    stop = None
+    if count > 0:
+        from worker import start_worker_threads
+
+        stop = start_worker_threads(count, queue=queue)
+        print(f"Started {count} inline worker thread(s).")
+    yield
+    if stop is not None:
+        # Unfinished jobs are re-delivered after their visibility timeout
+        stop.set()
+
+
 # ✅ Initialize FastAPI app
 app = FastAPI(
     title="Competitor Intelligence Engine",
     description="An autonomous multi-agent competitor analysis system powered by CrewAI",
     version="1.0.0",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan,
 )
 
 # ✅ Enable CORS for frontend / testing
@@ -42,6 +76,18 @@ class AnalysisResponse(BaseModel):
     message: str
     report: dict | None = None
 
+# ✅ Job Schemas
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    attempts: int = 0
+    report: dict | None = None
+    error: str | None = None
+
 
 @app.get("/")
 async def root():
@@ -63,16 +109,25 @@ async def analyze_competitor(request: CompetitorRequest):
 
         print(f"\nInitiating analysis for: {company_name} ({company_url})")
 
+        # Imported lazily: crewai and the tool stacks take seconds to load and
+        # would otherwise delay worker startup before the first request.
+        from crew import CompetitorAnalysisCrew, ScrapeFailedError, report_to_dict
+
         crew_instance = CompetitorAnalysisCrew()
         final_report = crew_instance.run(company_name, company_url)
 
+        if isinstance(crew_instance.last_error, ScrapeFailedError):
+            raise HTTPException(status_code=502, detail=str(crew_instance.last_error))
         if not final_report:
             raise HTTPException(status_code=500, detail="Crew execution failed to produce a report.")
 
+        report = report_to_dict(final_report)
+        get_report_store().save(report, company_name, company_url)
+
         return AnalysisResponse(
             status="success",
             message=f"Analysis for {company_name} completed successfully.",
-            report=final_report if isinstance(final_report, dict) else {"output": str(final_report)},
+            report=report,
         )
 
     except HTTPException as http_err:
@@ -84,6 +139,68 @@ async def analyze_competitor(request: CompetitorRequest):
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
 
+# Queue calls block (SQLite busy timeout, Redis round-trips), so the job endpoints are
+# plain functions that FastAPI runs in its threadpool instead of on the event loop
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+def submit_job(request: CompetitorRequest, idempotency_key: str | None = Header(default=None)):
+    """
+    Queue a competitor analysis for the worker pool. Resubmitting with the same
+    Idempotency-Key header returns the original job instead of queueing a new one.
+    """
+    company_name = request.company_name.strip()
+    company_url = request.company_url.strip()
+    if not company_name or not company_url:
+        raise HTTPException(status_code=400, detail="Company name and URL are required.")
+
+    queue = get_job_queue()
+    job_id = queue.enqueue({"company_name": company_name, "company_url": company_url}, idempotency_key)
+    job = queue.get(job_id)
+    return JobSubmitResponse(job_id=job_id, status=job["status"] if job else "queued")
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str):
+    """Poll the status of a queued analysis; `report` is set once it is done."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return JobStatusResponse(
+        job_id=job_id,
+        status=job["status"],
+        attempts=job["attempts"],
+        report=job["result"],
+        error=job.get("error") or None,
+    )
+
+
+@app.get("/export/{kind}")
+def export_reports(
+    kind: str,
+    format: str = Query("ndjson", description="ndjson or parquet"),
+    compression: str = Query("gzip", description="gzip, zstd or none"),
+    since: float | None = Query(None, description="Only reports created at/after this Unix time"),
+):
+    """
+    Stream every stored report (`kind=reports`) or competitor profile
+    (`kind=profiles`, BrandAnalysis flattened into columns) in one response.
+    """
+    from export import export_filename, export_media_type, export_stream
+
+    try:
+        stream = export_stream(kind, format, compression, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    filename = export_filename(kind, format, compression)
+    return StreamingResponse(
+        stream,
+        media_type=export_media_type(format, compression),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ✅ Optional: Local Testing Entry Point
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,174 @@
+# messaging_mapreduce.py (Chunked map-reduce messaging analysis)
+"""Analyze arbitrarily long scraped text without truncating it.
+
+The text (or a list of page texts) is split into chunks along section and
+sentence boundaries, each chunk is analyzed concurrently under a concurrency
+cap, and the partial analyses are reduced (hierarchically when they do not fit
+in one prompt) into a single messaging analysis. Latency grows with the depth
+of the reduce tree, not with the size of the site.
+"""
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+DEFAULT_CHUNK_CHARS = 6000
+# Same task key as analyze_messaging_task, so the model router picks the same tier
+TASK_REF = SimpleNamespace(name="MessagingAnalysis-mapreduce", output_pydantic=None)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+MAP_PROMPT = (
+    "You are an expert content strategist. Below is part {index} of {total} of the text "
+    "scraped from a competitor's website. Extract the core messaging from this part only:\n"
+    "- value propositions and claims\n"
+    "- target audience signals\n"
+    "- brand voice and tone\n"
+    "- calls to action and positioning statements\n"
+    "Be concise and factual; quote key phrases where useful.\n\n---\n{chunk}"
+)
+
+REDUCE_PROMPT = (
+    "You are an expert content strategist. The notes below were extracted from different "
+    "sections of the same competitor website. Merge them into one comprehensive messaging "
+    "analysis covering the core messaging strategy, brand voice, value propositions and "
+    "positioning. Remove duplicates and resolve contradictions.\n\n{partials}"
+)
+
+
+def _is_heading(block: str) -> bool:
+    """Short lines without closing punctuation usually start a new section."""
+    return len(block) < 80 and not block.rstrip().endswith((".", "!", "?", ",", ";", ":"))
+
+
+def _split_long_block(block: str, max_chars: int) -> list[str]:
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(documents: str | list[str], max_chars: int = DEFAULT_CHUNK_CHARS) -> list[str]:
+    """
+    Split one or more documents into chunks of at most `max_chars`, preferring to
+    break before headings and never splitting inside a sentence unless it is
+    longer than a whole chunk. Chunks never span two documents.
+    """
+    if isinstance(documents, str):
+        documents = [documents]
+
+    chunks = []
+    for document in documents:
+        blocks = []
+        for line in document.splitlines():
+            line = line.strip()
+            if line:
+                blocks.extend(_split_long_block(line, max_chars) if len(line) > max_chars else [line])
+
+        current = ""
+        for block in blocks:
+            too_long = len(current) + len(block) + 1 > max_chars
+            # Start a new chunk at a section heading once the current one is reasonably full
+            new_section = _is_heading(block) and len(current) > max_chars // 2
+            if current and (too_long or new_section):
+                chunks.append(current)
+                current = block
+            else:
+                current = f"{current}\n{block}" if current else block
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class MessagingMapReduce:
+    """Runs the map and reduce LLM calls for a chunked messaging analysis."""
+
+    def __init__(self, llm, max_concurrency: int | None = None, chunk_chars: int | None = None):
+        self.llm = llm
+        self.max_concurrency = max_concurrency or int(os.getenv("MESSAGING_MAX_CONCURRENCY", "4"))
+        self.chunk_chars = chunk_chars or int(os.getenv("MESSAGING_CHUNK_CHARS", str(DEFAULT_CHUNK_CHARS)))
+        self.retries = int(os.getenv("MESSAGING_CHUNK_RETRIES", "2"))
+
+    def _call(self, prompt: str) -> str:
+        return str(self.llm.call([{"role": "user", "content": prompt}], from_task=TASK_REF))
+
+    def _map(self, executor: ThreadPoolExecutor, prompts: list[str]) -> list[str | None]:
+        """Run `prompts` concurrently, retrying failures; failed prompts yield None in place."""
+        results = [None] * len(prompts)
+        pending = list(range(len(prompts)))
+        for attempt in range(1 + self.retries):
+            futures = [(i, executor.submit(self._call, prompts[i])) for i in pending]
+            pending = []
+            for i, future in futures:
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"Messaging chunk {i + 1}/{len(prompts)} failed (attempt {attempt + 1}): {e}")
+                    pending.append(i)
+            if not pending:
+                break
+        return results
+
+    def run(self, documents: str | list[str]) -> str:
+        start = time.perf_counter()
+        chunks = chunk_text(documents, self.chunk_chars)
+        if not chunks:
+            return "No text content available for messaging analysis."
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            mapped = self._map(executor, [
+                MAP_PROMPT.format(index=i, total=len(chunks), chunk=chunk)
+                for i, chunk in enumerate(chunks, start=1)
+            ])
+            partials = [p for p in mapped if p is not None]
+            if not partials:
+                raise RuntimeError("All messaging chunk analyses failed.")
+            missing = [i for i, p in enumerate(mapped, start=1) if p is None]
+
+            # Reduce in groups that fit one prompt until a single analysis remains
+            levels = 0
+            while len(partials) > 1:
+                groups, current = [], []
+                for partial in partials:
+                    if current and sum(len(p) for p in current) + len(partial) > self.chunk_chars:
+                        groups.append(current)
+                        current = []
+                    current.append(partial)
+                groups.append(current)
+                if len(groups) == len(partials) and len(partials) > 1:
+                    # Partials too long to combine pairwise; merge two at a time regardless
+                    groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+
+                partials = self._map(executor, [
+                    REDUCE_PROMPT.format(partials="\n\n---\n\n".join(group)) for group in groups
+                ])
+                if None in partials:
+                    # A dropped group would silently lose whole sections of the site
+                    raise RuntimeError("Messaging reduce step failed.")
+                levels += 1
+
+        print(
+            f"Map-reduce messaging analysis: {len(chunks)} chunks ({len(missing)} failed), "
+            f"{levels} reduce level(s), {time.perf_counter() - start:.2f}s"
+        )
+        if missing:
+            covered = sum(len(c) for i, c in enumerate(chunks, start=1) if i not in missing)
+            return (
+                f"{partials[0]}\n\n[Partial analysis: sections {', '.join(map(str, missing))} of "
+                f"{len(chunks)} could not be analyzed after {self.retries} retries; "
+                f"{covered} of {sum(len(c) for c in chunks)} characters are covered.]"
+            )
+        return partials[0]
@@ -0,0 +1,190 @@
+# model_router.py (Per-task LLM selection with escalation and cost tracking)
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from json_validator import extract_json_from_text
+
+# Ordered from cheapest to most capable; escalation walks this order.
+# Prices are USD per 1M tokens (input, output); tokens are estimated as chars / 4.
+DEFAULT_TIERS = {
+    "fast": {"model": "gemini-1.5-flash-8b", "input_cost": 0.0375, "output_cost": 0.15},
+    "standard": {"model": "gemini-1.5-flash", "input_cost": 0.075, "output_cost": 0.30},
+    "heavy": {"model": "gemini-1.5-pro", "input_cost": 1.25, "output_cost": 5.00},
+}
+
+# Keys are task names up to the first '-' (e.g. "CompileProfile-OpenAI" -> "CompileProfile")
+# or agent roles; anything unmatched uses DEFAULT_TIER.
+DEFAULT_ROUTES = {
+    "Scrape": "fast",
+    "VisualAnalysis": "standard",
+    "MessagingAnalysis": "standard",
+    "CompileProfile": "fast",
+    "GenerateStrategicReport": "heavy",
+    "Web Reconnaissance Specialist": "fast",
+}
+DEFAULT_TIER = "standard"
+
+
+def task_key(name: str | None) -> str | None:
+    return name.split("-", 1)[0] if name else None
+
+
+def _json_env(name: str) -> dict:
+    raw = os.getenv(name)
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        print(f"Ignoring invalid {name}: {e}")
+        return {}
+
+
+class ModelRouter:
+    """Maps tasks/agents to model tiers, escalates on validation failure and tracks per-tier usage."""
+
+    def __init__(self, tiers: dict | None = None, routes: dict | None = None, default_tier: str = DEFAULT_TIER):
+        self.tiers = tiers or DEFAULT_TIERS
+        self.order = list(self.tiers)
+        self.routes = routes if routes is not None else dict(DEFAULT_ROUTES)
+        if default_tier not in self.tiers:
+            fallback = DEFAULT_TIER if DEFAULT_TIER in self.tiers else self.order[0]
+            print(f"Unknown default model tier {default_tier!r}; using '{fallback}'.")
+            default_tier = fallback
+        self.default_tier = default_tier
+        self.escalations = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            tier: {"calls": 0, "errors": 0, "latency_s": 0.0, "input_chars": 0, "output_chars": 0, "cost_usd": 0.0}
+            for tier in self.tiers
+        }
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """
+        Build a router from MODEL_TIERS / MODEL_ROUTES (JSON) layered over the defaults,
+        e.g. MODEL_ROUTES='{"CompileProfile": "standard"}'.
+        """
+        tiers = {**DEFAULT_TIERS, **_json_env("MODEL_TIERS")}
+        routes = {**DEFAULT_ROUTES, **_json_env("MODEL_ROUTES")}
+        return cls(tiers=tiers, routes=routes, default_tier=os.getenv("MODEL_DEFAULT_TIER", DEFAULT_TIER))
+
+    def tier_for(self, task_name: str | None = None, agent_role: str | None = None) -> str:
+        key = task_key(task_name)
+        with self._lock:
+            if key in self.escalations:
+                return self.escalations[key]
+        for candidate in (key, agent_role):
+            if candidate and self.routes.get(candidate) in self.tiers:
+                return self.routes[candidate]
+        return self.default_tier
+
+    def escalate(self, task_name: str) -> str | None:
+        """Move a task to the next tier up; returns the new tier or None if already at the top."""
+        key = task_key(task_name)
+        current = self.tier_for(task_name)
+        index = self.order.index(current)
+        if index + 1 >= len(self.order):
+            return None
+        new_tier = self.order[index + 1]
+        with self._lock:
+            self.escalations[key] = new_tier
+        print(f"Escalating {key} from '{current}' to '{new_tier}' after failed validation.")
+        return new_tier
+
+    def record(self, tier: str, latency_s: float, input_chars: int, output_chars: int, error: bool = False) -> None:
+        config = self.tiers[tier]
+        cost = (
+            input_chars / 4 * config.get("input_cost", 0.0)
+            + output_chars / 4 * config.get("output_cost", 0.0)
+        ) / 1_000_000
+        with self._lock:
+            m = self.metrics[tier]
+            m["calls"] += 1
+            m["errors"] += int(error)
+            m["latency_s"] += latency_s
+            m["input_chars"] += input_chars
+            m["output_chars"] += output_chars
+            m["cost_usd"] += cost
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for tier, m in self.metrics.items():
+                if not m["calls"]:
+                    continue
+                result[tier] = {
+                    **m,
+                    "model": self.tiers[tier]["model"],
+                    "avg_latency_s": round(m["latency_s"] / m["calls"], 3),
+                    "cost_usd": round(m["cost_usd"], 6),
+                }
+            return result
+
+    def validation_guardrail(self, task_name: str, model_cls):
+        """
+        Task guardrail that validates the output against `model_cls` and escalates
+        the task's tier when it fails, so CrewAI's retry runs on a bigger model.
+        """
+        def guardrail(output) -> tuple[bool, Any]:
+            if getattr(output, "pydantic", None) is not None:
+                return True, output
+            data = extract_json_from_text(getattr(output, "raw", str(output)) or "")
+            try:
+                model_cls.model_validate(data)
+                return True, output
+            except Exception as e:
+                self.escalate(task_name)
+                return False, f"Output did not validate as {model_cls.__name__}: {e}. Return only valid JSON."
+
+        return guardrail
+
+
+class RoutedLLM(BaseLLM):
+    """BaseLLM that dispatches each call to the model tier routed for the calling task."""
+
+    def __init__(self, router: ModelRouter, llm_factory) -> None:
+        super().__init__(model=f"routed:{router.tiers[router.default_tier]['model']}")
+        self.router = router
+        self._llm_factory = llm_factory
+        self._llms = {}
+        # Map-reduce calls in from several threads; build each tier's client once
+        self._llms_lock = threading.Lock()
+
+    def _llm_for(self, tier: str):
+        with self._llms_lock:
+            if tier not in self._llms:
+                self._llms[tier] = self._llm_factory(self.router.tiers[tier]["model"])
+            return self._llms[tier]
+
+    def call(self, messages, tools: list[dict] | None = None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        tier = self.router.tier_for(
+            getattr(from_task, "name", None), getattr(from_agent, "role", None)
+        )
+        if isinstance(messages, list):
+            input_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        else:
+            input_chars = len(str(messages or ""))
+
+        start = time.perf_counter()
+        try:
+            result = self._llm_for(tier).call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+            )
+        except Exception:
+            self.router.record(tier, time.perf_counter() - start, input_chars, 0, error=True)
+            raise
+        self.router.record(tier, time.perf_counter() - start, input_chars, len(str(result or "")))
+        return result
+
+    def supports_function_calling(self) -> bool:
+        return False
@@ -0,0 +1,92 @@
+# report_store.py (Persistent store of completed reports for bulk export)
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_REPORT_STORE_PATH = os.path.join(".data", "reports.db")
+
+
+class ReportStore:
+    """Append-only SQLite table of StrategicReport dicts, read back as a stream."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    id TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    company_url TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    report TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("DROP INDEX IF EXISTS reports_created")
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_created_id ON reports (created_at, id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(self, report: dict, company_name: str, company_url: str, report_id: str | None = None) -> str:
+        """Store a report; saving the same `report_id` twice (e.g. a re-delivered job) is a no-op."""
+        report_id = report_id or uuid.uuid4().hex
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO reports (id, company_name, company_url, created_at, report) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (report_id, company_name, company_url, time.time(), json.dumps(report)),
+            )
+        return report_id
+
+    def iter_reports(self, since: float | None = None, batch_size: int = 500):
+        """
+        Yield stored reports oldest first, `batch_size` rows per query.
+        Each batch uses its own short-lived connection and resumes after the
+        last (created_at, id) seen, so consecutive pieces of a streamed export
+        may be produced on different threads.
+        """
+        after = None
+        while True:
+            with contextlib.closing(self._connect()) as conn:
+                if after is None:
+                    rows = conn.execute(
+                        "SELECT id, company_name, company_url, created_at, report FROM reports "
+                        "WHERE created_at >= ? ORDER BY created_at, id LIMIT ?",
+                        (since or 0, batch_size),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT id, company_name, company_url, created_at, report FROM reports "
+                        "WHERE created_at > ? OR (created_at = ? AND id > ?) ORDER BY created_at, id LIMIT ?",
+                        (after[0], after[0], after[1], batch_size),
+                    ).fetchall()
+            for row in rows:
+                record = dict(row)
+                record["report"] = json.loads(record["report"])
+                yield record
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_report_store(path: str | None = None) -> ReportStore:
+    path = path or os.getenv("REPORT_STORE_PATH", DEFAULT_REPORT_STORE_PATH)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ReportStore(path)
+        return _stores[path]
@@ -1,4 +1,5 @@
 # tasks.py (Optimized and Final)
+import json
 from crewai import Task
 from models import BrandAnalysis, CompetitorProfile, StrategicReport
 
@@ -8,6 +9,30 @@ class CompetitorAnalysisTasks:
     for automated competitor intelligence gathering and strategic synthesis.
     """
 
+    def __init__(self, router=None):
+        self.router = router
+
+    def _guardrail_kwargs(self, name: str, model_cls) -> dict:
+        """
+        With a model router, structured tasks validate their output and escalate
+        to a bigger model tier before CrewAI retries them.
+        """
+        if self.router is None:
+            return {}
+        return {"guardrail": self.router.validation_guardrail(name, model_cls)}
+
+    @staticmethod
+    def format_tool_context(step: str, data) -> str:
+        """
+        Render the output of a tool-only step as a context block that can be
+        appended to a downstream task description.
+        """
+        if isinstance(data, (dict, list)):
+            body = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            body = str(data)
+        return f"\n\n--- Output of the '{step}' step (already executed, do not call tools for it) ---\n{body}"
+
     def scrape_website_task(self, agent, url: str):
         return Task(
             name=f"Scrape-{url}",
@@ -16,7 +41,7 @@ class CompetitorAnalysisTasks:
             expected_output="A dictionary with 'text_content' and 'hero_image_url'."
         )
 
-    def analyze_visuals_task(self, agent):
+    def analyze_visuals_task(self, agent, tool_context: str | None = None):
         return Task(
             name="VisualAnalysis",
             description=(
@@ -26,24 +51,25 @@ class CompetitorAnalysisTasks:
                 "- design_style: <description of overall design style>\n"
                 "- emotional_tone: <perceived emotional tone>\n"
                 "- logo_analysis: <analysis of the company logo>"
-            ),
+            ) + (tool_context or ""),
             agent=agent,
             output_pydantic=BrandAnalysis,
+            **self._guardrail_kwargs("VisualAnalysis", BrandAnalysis),
             expected_output="A fully populated BrandAnalysis Pydantic object."
         )
 
-    def analyze_messaging_task(self, agent):
+    def analyze_messaging_task(self, agent, tool_context: str | None = None):
         return Task(
             name="MessagingAnalysis",
             description=(
                 "Analyze the scraped text content for the website’s core messaging strategy, "
                 "brand voice, and value propositions."
-            ),
+            ) + (tool_context or ""),
             agent=agent,
             expected_output="A comprehensive text-based messaging analysis."
         )
 
-    def compile_profile_task(self, agent, company_name: str, url: str):
+    def compile_profile_task(self, agent, company_name: str, url: str, tool_context: str | None = None):
         return Task(
             name=f"CompileProfile-{company_name}",
             description=(
@@ -54,9 +80,10 @@ class CompetitorAnalysisTasks:
                 f"- url: '{url}'\n"
                 f"- messaging_analysis: <detailed text analysis of messaging>\n"
                 f"- visual_analysis: <object with primary_colors, secondary_colors, design_style, emotional_tone, logo_analysis>"
-            ),
+            ) + (tool_context or ""),
             agent=agent,
             output_pydantic=CompetitorProfile,
+            **self._guardrail_kwargs(f"CompileProfile-{company_name}", CompetitorProfile),
             expected_output=f"A validated CompetitorProfile Pydantic object for {company_name}."
         )
 
@@ -74,5 +101,6 @@ class CompetitorAnalysisTasks:
             ),
             agent=agent,
             output_pydantic=StrategicReport,
+            **self._guardrail_kwargs("GenerateStrategicReport", StrategicReport),
             expected_output="A complete StrategicReport Pydantic object with insights and recommendations."
         )
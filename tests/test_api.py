@@ -0,0 +1,43 @@
+import warnings
+
+import pytest
+from fastapi.testclient import TestClient
+
+import job_queue
+from job_queue import JobQueue
+
+PAYLOAD = {"company_name": "Acme", "company_url": "https://acme.example"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_URL", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setenv("API_INLINE_WORKERS", "0")
+    monkeypatch.setattr(job_queue, "_queues", {})
+    with warnings.catch_warnings():
+        # on_event startup hooks would raise here; the lifespan handler must not
+        warnings.simplefilter("error", DeprecationWarning)
+        import main
+
+        with TestClient(main.app) as client:
+            yield client
+
+
+def test_submitted_job_can_be_polled(client):
+    submitted = client.post("/jobs", json=PAYLOAD, headers={"Idempotency-Key": "k1"})
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+    assert submitted.json()["status"] == "queued"
+
+    again = client.post("/jobs", json=PAYLOAD, headers={"Idempotency-Key": "k1"})
+    assert again.json()["job_id"] == job_id
+
+    polled = client.get(f"/jobs/{job_id}")
+    assert polled.status_code == 200
+    assert polled.json()["status"] == "queued"
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_job_queue_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JobQueue()
@@ -0,0 +1,106 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import cassette
+from cassette import Cassette, CassetteConflictError, CassetteMissError
+from tools import image_cache
+from tools.google_gemini_adapter import GoogleGeminiAdapter
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = f"<html><body>Page {self.path}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_generate(self, prompt, generation_config=None):
+        calls.append(prompt)
+        return f"analysis of {prompt}"
+
+    monkeypatch.setattr(GoogleGeminiAdapter, "_generate", fake_generate)
+    return calls
+
+
+@pytest.fixture
+def adapter():
+    return GoogleGeminiAdapter(api_key="test-key", model="gemini-1.5-flash")
+
+
+def test_record_then_replay_offline(tmp_path, server, llm_calls, adapter):
+    path = str(tmp_path / "run.jsonl.gz")
+    url = f"http://127.0.0.1:{server.server_port}/pricing"
+
+    with Cassette(path, mode="record"):
+        recorded_page = requests.get(url).text
+        recorded_text = adapter._generate("messaging prompt")
+    assert llm_calls == ["messaging prompt"]
+
+    server.shutdown()
+    server.server_close()
+    with Cassette(path, mode="replay"):
+        assert requests.get(url).text == recorded_page
+        assert adapter._generate("messaging prompt") == recorded_text
+        with pytest.raises(CassetteMissError):
+            adapter._generate("a prompt that was never recorded")
+    assert llm_calls == ["messaging prompt"]
+
+
+def test_vision_cache_is_bypassed_while_active(tmp_path, monkeypatch):
+    monkeypatch.setenv("VISION_CACHE_DIR", str(tmp_path / "vision"))
+    monkeypatch.setattr(image_cache, "_cache", None)
+    with Cassette(str(tmp_path / "run.jsonl.gz"), mode="record"):
+        assert image_cache.get_image_cache() is None
+    assert image_cache.get_image_cache() is not None
+
+
+def test_nested_entries_share_patches_until_the_last_exit(tmp_path):
+    original = requests.sessions.Session.__dict__["request"]
+    shared = Cassette(str(tmp_path / "run.jsonl.gz"), mode="record")
+    with shared:
+        patched = requests.sessions.Session.__dict__["request"]
+        with shared:
+            assert requests.sessions.Session.__dict__["request"] is patched
+        assert requests.sessions.Session.__dict__["request"] is patched
+        assert not (tmp_path / "run.jsonl.gz").exists()
+    assert requests.sessions.Session.__dict__["request"] is original
+    assert (tmp_path / "run.jsonl.gz").exists()
+    assert cassette._active is None
+
+
+def test_a_second_cassette_cannot_be_entered_concurrently(tmp_path):
+    original = requests.sessions.Session.__dict__["request"]
+    with Cassette(str(tmp_path / "a.jsonl.gz"), mode="record"):
+        with pytest.raises(CassetteConflictError):
+            with Cassette(str(tmp_path / "b.jsonl.gz"), mode="record"):
+                pass
+    assert requests.sessions.Session.__dict__["request"] is original
+    assert not (tmp_path / "b.jsonl.gz").exists()
+
+
+def test_cassette_from_env_returns_one_shared_instance(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette, "_cassettes", {})
+    monkeypatch.setenv("CASSETTE_PATH", str(tmp_path / "env.jsonl.gz"))
+    monkeypatch.setenv("CASSETTE_MODE", "record")
+    assert cassette.cassette_from_env() is cassette.cassette_from_env()
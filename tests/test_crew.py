@@ -0,0 +1,55 @@
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+import agents
+import tools.scraper_tool as scraper_tool
+from crew import CompetitorAnalysisCrew, ScrapeFailedError
+
+
+class ScrapingLLM(BaseLLM):
+    """Always asks for the scraper, the way the web recon agent starts its task."""
+
+    def __init__(self):
+        super().__init__(model="scripted")
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None,
+             from_agent=None, **kwargs):
+        self.calls += 1
+        return (
+            "Thought: I need the page content.\n"
+            "Action: website_scraper\n"
+            'Action Input: {"url": "https://acme.example"}'
+        )
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+@pytest.fixture
+def failing_fetch(monkeypatch):
+    def fetch(url, **kwargs):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(scraper_tool, "fetch", fetch)
+
+
+def test_agent_driven_scrape_failure_aborts_the_crew(monkeypatch, failing_fetch):
+    monkeypatch.setenv("TOOL_ONLY_STEPS", "none")
+    monkeypatch.setenv("SCRAPE_FAST_FAIL", "1")
+    llm = ScrapingLLM()
+    monkeypatch.setattr(agents, "_get_gemini_llm", lambda router=None: llm)
+
+    crew = CompetitorAnalysisCrew()
+    assert crew.run("Acme", "https://acme.example") is None
+    assert isinstance(crew.last_error, ScrapeFailedError)
+    assert "connection refused" in str(crew.last_error)
+    # No retries by the agent and no downstream tasks
+    assert llm.calls == 1
+
+
+def test_scraper_returns_error_dict_unless_asked_to_raise(failing_fetch):
+    tool = scraper_tool.WebsiteScraperTool()
+    assert tool.run(url="https://acme.example") == {"error": "connection refused"}
+    with pytest.raises(ConnectionError):
+        scraper_tool.WebsiteScraperTool(raise_on_error=True).run(url="https://acme.example")
@@ -0,0 +1,60 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from tools.http_fetch import HedgedFetcher, HostLatencyTracker
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server; `/slow` never answers within the test budgets."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/slow":
+                time.sleep(3)
+            body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_timeout_adapts_down_but_never_above_the_default():
+    tracker = HostLatencyTracker(default_timeout=10.0)
+    assert tracker.timeout_for("fast") == 10.0
+    for _ in range(5):
+        tracker.record("fast", 0.1)
+        tracker.record("slow", 8.0)
+    assert tracker.timeout_for("fast") == 2.0
+    assert tracker.timeout_for("slow") == 10.0
+
+
+def test_tarpitting_host_costs_at_most_the_budget(server):
+    fetcher = HedgedFetcher(retries=2, hedge_delay=0.2, backoff=0.1, budget=1.0)
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.Timeout):
+        fetcher.get(f"{server}/slow")
+    assert time.monotonic() - start < 1.5
+    # Timeouts are not latency samples, so the host's timeout does not grow
+    assert fetcher.tracker.p95("127.0.0.1") is None
+
+
+def test_fast_host_is_fetched_in_one_request(server):
+    fetcher = HedgedFetcher(budget=5.0)
+    response = fetcher.get(f"{server}/")
+    assert response.status_code == 200
+    assert response.text == "ok"
+    assert fetcher.stats["requests"] == 1
@@ -0,0 +1,78 @@
+import io
+import json
+import os
+
+from PIL import Image, ImageDraw
+
+from tools.image_cache import ImageAnalysisCache
+from tools.image_hashing import hamming_distance, is_near_duplicate, phash
+
+
+def hero(seed: int = 0) -> Image.Image:
+    img = Image.new("RGB", (640, 360), (20 + seed * 40, 60, 160))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse([80 + seed * 60, 60, 300 + seed * 60, 280], fill=(250, 200, 40))
+    draw.rectangle([380, 120 + seed * 40, 600, 200 + seed * 40], fill=(255, 255, 255))
+    return img
+
+
+def reencode(img: Image.Image, quality: int) -> Image.Image:
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return Image.open(io.BytesIO(buffer.getvalue()))
+
+
+def test_phash_survives_reencoding_and_resizing():
+    original = phash(hero())
+    assert is_near_duplicate(original, phash(reencode(hero(), quality=40)))
+    assert is_near_duplicate(original, phash(hero().resize((320, 180))))
+    assert hamming_distance(original, phash(hero(seed=3))) > 6
+
+
+def test_near_matches_and_hit_rate(tmp_path):
+    cache = ImageAnalysisCache(str(tmp_path))
+    hashes = [phash(hero())]
+    assert cache.get(hashes) is None
+    cache.put(hashes, "bold and warm", ["#ffcc00"])
+
+    assert cache.get(hashes)["description"] == "bold and warm"
+    # Two differing bits, as between a hero and its re-encoded copy on another CDN
+    assert cache.get([hashes[0] ^ 0b101])["palette"] == ["#ffcc00"]
+    assert cache.get([phash(hero(seed=3))]) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ImageAnalysisCache(str(tmp_path), max_entries=2)
+    cache.put([1], "one", [])
+    cache.put([2 ** 40 - 1], "two", [])
+    cache.get([1])
+    cache.put([2 ** 64 - 1], "three", [])
+    assert cache.get([2 ** 40 - 1]) is None
+    assert cache.get([1])["description"] == "one"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_reads_are_persisted_for_lru_order(tmp_path):
+    cache = ImageAnalysisCache(str(tmp_path))
+    cache.put([1], "one", [])
+    before = json.loads((tmp_path / "index.json").read_text())[f"{1:016x}"]["last_used"]
+    cache.get([1])
+    cache.flush()
+    after = json.loads((tmp_path / "index.json").read_text())[f"{1:016x}"]["last_used"]
+    assert after > before
+
+
+def test_processes_sharing_a_directory_keep_each_others_entries(tmp_path):
+    first = ImageAnalysisCache(str(tmp_path))
+    second = ImageAnalysisCache(str(tmp_path))
+    first.put([1], "one", [])
+    second.put([2 ** 64 - 1], "two", [])
+
+    reloaded = ImageAnalysisCache(str(tmp_path))
+    assert reloaded.get([1])["description"] == "one"
+    assert reloaded.get([2 ** 64 - 1])["description"] == "two"
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
@@ -0,0 +1,25 @@
+from tools.image_selection import classify_image, score_image_candidate, select_images
+
+
+def candidate(url, alt="", hints="", position=5):
+    return {"url": url, "alt": alt, "width": None, "height": None, "position": position, "hints": hints}
+
+
+def test_keywords_match_whole_tokens_only():
+    assert classify_image(candidate("https://example.com/img/team.jpg", hints="wrapper")) == "other"
+    assert classify_image(candidate("https://example.com/img/app-screen.png")) == "product"
+    assert classify_image(candidate("https://example.com/img/a.png", hints="heroImage")) == "hero"
+    assert classify_image(candidate("https://example.com/img/logos/acme.png")) == "logo"
+
+
+def test_host_name_does_not_label_or_score_images():
+    on_brand_host = candidate("https://www.brandwatch.com/img/team.jpg")
+    plain_host = candidate("https://www.example.com/img/team.jpg")
+    assert classify_image(on_brand_host) == "other"
+    assert score_image_candidate(on_brand_host) == score_image_candidate(plain_host)
+
+
+def test_noise_ranks_below_brand_images():
+    icon = candidate("https://example.com/static/favicon.png", position=0)
+    logo = candidate("https://example.com/static/site-logo.png", alt="Acme", position=3)
+    assert [c["url"] for c in select_images([icon, logo], 2)] == [logo["url"], icon["url"]]
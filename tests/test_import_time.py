@@ -0,0 +1,13 @@
+from benchmarks.import_time import DEFERRED_MODULES, deferred_imports, measure
+
+
+def test_main_does_not_import_heavy_stacks():
+    modules = measure("main")["modules"]
+    assert "main" in modules
+    assert deferred_imports(modules) == []
+
+
+def test_deferred_imports_matches_submodules_only():
+    modules = {"redis": {}, "PIL.Image": {}, "numpyro": {}, "fastapi": {}}
+    assert deferred_imports(modules) == ["PIL.Image", "redis"]
+    assert "redis" in DEFERRED_MODULES
@@ -0,0 +1,89 @@
+import pytest
+
+from job_queue import SQLiteJobQueue
+
+PAYLOAD = {"company_name": "Acme", "company_url": "https://acme.example"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+
+
+def test_idempotency_key_returns_original_job(queue):
+    first = queue.enqueue(PAYLOAD, idempotency_key="abc")
+    assert queue.enqueue(PAYLOAD, idempotency_key="abc") == first
+    assert queue.enqueue(PAYLOAD, idempotency_key="other") != first
+    assert queue.enqueue(PAYLOAD) != queue.enqueue(PAYLOAD)
+    assert queue.get(first)["status"] == "queued"
+
+
+def test_claimed_job_is_hidden_until_lease_expires(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    claimed = queue.claim("w1", visibility_timeout=60)
+    assert claimed == {"id": job_id, "payload": PAYLOAD, "attempts": 1}
+    assert queue.claim("w2", visibility_timeout=60) is None
+
+
+def test_expired_lease_is_redelivered(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=0)
+    redelivered = queue.claim("w2", visibility_timeout=60)
+    assert redelivered["id"] == job_id
+    assert redelivered["attempts"] == 2
+    assert queue.get(job_id)["lease_owner"] == "w2"
+
+
+def test_heartbeat_only_extends_the_current_lease(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=0)
+    queue.claim("w2", visibility_timeout=60)
+    assert not queue.heartbeat(job_id, "w1", visibility_timeout=60)
+    assert queue.heartbeat(job_id, "w2", visibility_timeout=60)
+    queue.complete(job_id, "w2", {"report_title": "done"})
+    assert not queue.heartbeat(job_id, "w2", visibility_timeout=60)
+
+
+def test_first_completion_wins(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=0)
+    queue.claim("w2", visibility_timeout=60)
+    assert queue.complete(job_id, "w2", {"report_title": "first"})
+    assert not queue.complete(job_id, "w1", {"report_title": "second"})
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"report_title": "first"}
+
+
+def test_failed_job_is_retried_until_max_attempts(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=60)
+    queue.fail(job_id, "w1", "boom")
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert queue.claim("w1", visibility_timeout=60)["attempts"] == 2
+    queue.fail(job_id, "w1", "boom again")
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "boom again"
+    assert queue.claim("w1", visibility_timeout=60) is None
+
+
+def test_expired_lease_after_max_attempts_fails_the_job(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=0)
+    queue.claim("w2", visibility_timeout=0)
+    assert queue.claim("w3", visibility_timeout=60) is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Lease expired after max attempts"
+
+
+def test_fail_from_a_stale_worker_is_ignored(queue):
+    job_id = queue.enqueue(PAYLOAD)
+    queue.claim("w1", visibility_timeout=0)
+    queue.claim("w2", visibility_timeout=60)
+    queue.fail(job_id, "w1", "stale")
+    job = queue.get(job_id)
+    assert job["status"] == "running"
+    assert job["lease_owner"] == "w2"
@@ -0,0 +1,87 @@
+import pytest
+
+from messaging_mapreduce import MessagingMapReduce, chunk_text
+
+
+class FakeLLM:
+    """Answers every prompt with a short note; chunks listed in `failures` fail that many times."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.prompts = []
+
+    def call(self, messages, from_task=None):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        for marker, remaining in self.failures.items():
+            if marker in prompt and remaining:
+                self.failures[marker] -= 1
+                raise RuntimeError("rate limited")
+        return "notes"
+
+
+def page(sections: int, chars: int = 900) -> str:
+    return "\n".join(f"Section {i}\n" + f"Sentence {i}. " * (chars // 12) for i in range(sections))
+
+
+def test_chunks_cover_the_whole_text_within_the_limit():
+    text = page(10)
+    chunks = chunk_text(text, max_chars=2000)
+    assert len(chunks) > 1
+    assert all(len(c) <= 2000 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_failed_chunks_are_retried(monkeypatch):
+    monkeypatch.setenv("MESSAGING_CHUNK_RETRIES", "2")
+    llm = FakeLLM({"Section 3": 2})
+    result = MessagingMapReduce(llm, chunk_chars=2000).run(page(10))
+    assert "Partial analysis" not in result
+
+
+def test_chunks_failing_every_retry_are_flagged(monkeypatch):
+    monkeypatch.setenv("MESSAGING_CHUNK_RETRIES", "1")
+    llm = FakeLLM({"Section 3": 10})
+    result = MessagingMapReduce(llm, chunk_chars=2000).run(page(10))
+    assert "[Partial analysis: sections 2 of" in result
+
+
+def test_reduce_failure_is_not_silently_dropped(monkeypatch):
+    monkeypatch.setenv("MESSAGING_CHUNK_RETRIES", "0")
+    llm = FakeLLM({"Merge them": 1})
+    with pytest.raises(RuntimeError):
+        MessagingMapReduce(llm, chunk_chars=2000).run(page(10))
+
+
+def landing_page(sections: int) -> tuple[str, list[str]]:
+    """Marketing-style HTML whose sentences wrap links and emphasis, plus those sentences as plain text."""
+    html, sentences = ["<html><body><nav><a href='/'>Home</a> <a href='/pricing'>Pricing</a></nav>"], []
+    for i in range(sections):
+        html.append(f"<section><h2>Feature <span>{i}</span></h2>")
+        for j in range(4):
+            html.append(
+                f"<p>Acme helps team {i}-{j} <a href='/ship'>ship faster with</a> <strong>fewer</strong>\n"
+                f"   bugs. Every <em>release</em> is reviewed, tested and <a href='/docs'>documented</a>.</p>"
+            )
+            sentences += [
+                f"Acme helps team {i}-{j} ship faster with fewer bugs.",
+                "Every release is reviewed, tested and documented.",
+            ]
+        html.append("<ul><li>Fast <b>builds</b></li><li>Safe deploys</li></ul></section>")
+    html.append("</body></html>")
+    return "".join(html), sentences
+
+
+def test_chunks_of_scraped_html_keep_inline_text_in_its_sentence():
+    from tools.scraper_tool import WebsiteScraperTool
+
+    html, sentences = landing_page(6)
+    text = WebsiteScraperTool()._parse(html, "https://acme.example")["text"]
+    chunks = chunk_text(text, max_chars=600)
+
+    assert len(chunks) > 1
+    for sentence in sentences:
+        assert any(sentence in chunk for chunk in chunks), sentence
+    for chunk in chunks:
+        last = chunk.splitlines()[-1]
+        assert last.endswith(".") or last in ("Fast builds", "Safe deploys"), last
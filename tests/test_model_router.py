@@ -0,0 +1,84 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from model_router import DEFAULT_TIERS, ModelRouter, RoutedLLM
+from models import BrandAnalysis
+
+VALID_BRAND = (
+    '{"primary_colors": ["#000000"], "secondary_colors": ["#ffffff"], "design_style": "minimal", '
+    '"emotional_tone": "calm", "logo_analysis": "wordmark"}'
+)
+
+
+def test_tasks_route_by_name_prefix_then_agent_role():
+    router = ModelRouter()
+    assert router.tier_for("GenerateStrategicReport") == "heavy"
+    assert router.tier_for("CompileProfile-OpenAI") == "fast"
+    assert router.tier_for(None, "Web Reconnaissance Specialist") == "fast"
+    assert router.tier_for("Unknown", "Unknown role") == "standard"
+
+
+def test_invalid_default_tier_falls_back_to_standard(capsys):
+    router = ModelRouter(default_tier="turbo")
+    assert router.default_tier == "standard"
+    assert "turbo" in capsys.readouterr().out
+
+
+def test_escalation_walks_up_to_the_top_tier():
+    router = ModelRouter()
+    assert router.escalate("CompileProfile-OpenAI") == "standard"
+    assert router.tier_for("CompileProfile-Anthropic") == "standard"
+    assert router.escalate("CompileProfile-OpenAI") == "heavy"
+    assert router.escalate("CompileProfile-OpenAI") is None
+    assert router.tier_for("CompileProfile-OpenAI") == "heavy"
+
+
+def test_record_estimates_cost_from_characters():
+    router = ModelRouter()
+    router.record("heavy", 2.0, input_chars=4_000_000, output_chars=400_000)
+    router.record("heavy", 1.0, input_chars=0, output_chars=0, error=True)
+    stats = router.stats()
+    assert list(stats) == ["heavy"]
+    heavy = stats["heavy"]
+    expected = 1_000_000 * DEFAULT_TIERS["heavy"]["input_cost"] / 1e6 + 100_000 * DEFAULT_TIERS["heavy"]["output_cost"] / 1e6
+    assert heavy["cost_usd"] == pytest.approx(expected)
+    assert (heavy["calls"], heavy["errors"], heavy["avg_latency_s"]) == (2, 1, 1.5)
+
+
+def test_guardrail_accepts_valid_json_and_escalates_invalid_output():
+    router = ModelRouter()
+    guardrail = router.validation_guardrail("VisualAnalysis", BrandAnalysis)
+
+    ok, _ = guardrail(SimpleNamespace(pydantic=None, raw=f"Here you go:\n```json\n{VALID_BRAND}\n```"))
+    assert ok
+    assert router.tier_for("VisualAnalysis") == "standard"
+
+    ok, feedback = guardrail(SimpleNamespace(pydantic=None, raw='{"primary_colors": "black"}'))
+    assert not ok
+    assert "BrandAnalysis" in feedback
+    assert router.tier_for("VisualAnalysis") == "heavy"
+
+
+def test_routed_llm_builds_one_client_per_tier_across_threads():
+    built = []
+
+    def factory(model):
+        time.sleep(0.05)
+        built.append(model)
+        return SimpleNamespace(call=lambda messages, **kwargs: "ok")
+
+    llm = RoutedLLM(ModelRouter(), factory)
+    task = SimpleNamespace(name="MessagingAnalysis-mapreduce")
+    threads = [
+        threading.Thread(target=llm.call, args=([{"role": "user", "content": "hi"}],), kwargs={"from_task": task})
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert built == [DEFAULT_TIERS["standard"]["model"]]
+    assert llm.router.stats()["standard"]["calls"] == 4
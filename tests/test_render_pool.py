@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from tools.render_pool import BrowserRenderPool
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+class FakePool(BrowserRenderPool):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = 0
+
+    def _create_driver(self):
+        self.started += 1
+        return FakeDriver()
+
+
+def test_waiter_uses_capacity_freed_by_an_unhealthy_driver():
+    pool = FakePool(size=1, page_timeout=5)
+    driver = pool._acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool._acquire()))
+    waiter.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    pool._release(driver, healthy=False)
+    waiter.join(timeout=2)
+    assert acquired and time.monotonic() - start < 1
+    assert pool.started == 2
+
+
+def test_waiter_gets_a_released_driver():
+    pool = FakePool(size=1, page_timeout=5)
+    driver = pool._acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool._acquire()))
+    waiter.start()
+    time.sleep(0.1)
+    pool._release(driver)
+    waiter.join(timeout=2)
+    assert acquired == [driver]
+    assert pool.started == 1
+
+
+def test_acquire_times_out_when_the_pool_stays_busy():
+    pool = FakePool(size=1, page_timeout=0.2)
+    pool._acquire()
+    with pytest.raises(TimeoutError):
+        pool._acquire()
@@ -0,0 +1,93 @@
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import report_store
+from export import export_stream
+from report_store import ReportStore
+
+
+def make_report(i: int) -> dict:
+    return {
+        "report_title": f"Report {i}",
+        "comparative_summary": "summary",
+        "identified_gaps_and_opportunities": "gaps",
+        "strategic_recommendations": "recommendations",
+        "competitor_profiles": [{
+            "company_name": f"Company {i}",
+            "url": f"https://company{i}.example",
+            "messaging_analysis": "messaging",
+            "visual_analysis": {"primary_colors": ["#000000"], "design_style": "minimal"},
+        }],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "reports.db"))
+
+
+def test_iter_reports_pages_through_identical_timestamps(store, monkeypatch):
+    monkeypatch.setattr(report_store.time, "time", lambda: 1000.0)
+    ids = {store.save(make_report(i), "Acme", "https://acme.example") for i in range(23)}
+    seen = [r["id"] for r in store.iter_reports(batch_size=5)]
+    assert len(seen) == 23
+    assert set(seen) == ids
+
+
+def test_since_filters_older_reports(store, monkeypatch):
+    for created_at in (100.0, 200.0, 300.0):
+        monkeypatch.setattr(report_store.time, "time", lambda t=created_at: t)
+        store.save(make_report(int(created_at)), "Acme", "https://acme.example")
+    assert [r["created_at"] for r in store.iter_reports(since=200.0, batch_size=1)] == [200.0, 300.0]
+
+
+def test_export_can_be_advanced_from_different_threads(store):
+    """Starlette advances sync streaming generators on threadpool workers."""
+    for i in range(1500):
+        store.save(make_report(i), "Acme", "https://acme.example")
+
+    stream = export_stream("profiles", "ndjson", "gzip", store=store)
+    pieces = []
+    while True:
+        # A fresh single-use thread for every piece, like a worker pool under load
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            piece = executor.submit(next, stream, None).result()
+        if piece is None:
+            break
+        pieces.append(piece)
+
+    assert len(pieces) > 1
+    rows = [json.loads(line) for line in gzip.decompress(b"".join(pieces)).splitlines()]
+    assert len(rows) == 1500
+    assert {row["company_name"] for row in rows} == {f"Company {i}" for i in range(1500)}
+
+
+def test_parquet_export_round_trips(store):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pa = pytest.importorskip("pyarrow")
+    for i in range(1200):
+        store.save(make_report(i), "Acme", "https://acme.example")
+
+    # More records than one row group, so the file is assembled from several drained pieces
+    data = b"".join(export_stream("profiles", "parquet", "zstd", store=store))
+    parquet = pq.ParquetFile(pa.BufferReader(data))
+    assert parquet.metadata.num_row_groups == 2
+    rows = parquet.read().to_pylist()
+    assert len(rows) == 1200
+    assert {row["company_name"] for row in rows} == {f"Company {i}" for i in range(1200)}
+    assert all(row["visual_primary_colors"] == ["#000000"] for row in rows)
+    assert all(row["visual_secondary_colors"] is None for row in rows)
+
+
+def test_zstd_ndjson_export_round_trips(store):
+    zstandard = pytest.importorskip("zstandard")
+    for i in range(30):
+        store.save(make_report(i), "Acme", "https://acme.example")
+
+    data = b"".join(export_stream("reports", "ndjson", "zstd", store=store))
+    with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+        rows = [json.loads(line) for line in reader.read().splitlines()]
+    assert sorted(row["report_title"] for row in rows) == sorted(f"Report {i}" for i in range(30))
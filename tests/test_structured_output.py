@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from crewai.utilities.converter import Converter, convert_to_model
+
+from model_router import ModelRouter, RoutedLLM
+from models import BrandAnalysis
+from tools import google_gemini_adapter
+from tools.google_gemini_adapter import GoogleGeminiAdapter, reset_structured_output_stats, structured_output_stats
+
+VALID_BRAND = (
+    '{"primary_colors": ["#000000"], "secondary_colors": ["#ffffff"], "design_style": "minimal", '
+    '"emotional_tone": "calm", "logo_analysis": "wordmark"}'
+)
+PROSE = "The brand uses black and white, a minimal style, a calm tone and a wordmark logo."
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    reset_structured_output_stats()
+    llm = GoogleGeminiAdapter(api_key="test-key", model="gemini-1.5-flash")
+    monkeypatch.setattr(GoogleGeminiAdapter, "_generate", lambda self, prompt, config=None: VALID_BRAND)
+    return llm
+
+
+def agent_for(adapter):
+    """An agent wired like production: the converter talks to the routed LLM."""
+    return SimpleNamespace(
+        llm=RoutedLLM(ModelRouter(), lambda model: adapter),
+        function_calling_llm=None,
+        verbose=False,
+        get_output_converter=lambda llm, text, model, instructions: Converter(
+            llm=llm, text=text, model=model, instructions=instructions
+        ),
+    )
+
+
+def test_structured_task_output_needs_no_converter_call(adapter):
+    task = SimpleNamespace(name="VisualAnalysis", output_pydantic=BrandAnalysis)
+    raw = adapter.call("Analyze the brand.", from_task=task, from_agent=SimpleNamespace(tools=[]))
+
+    result = convert_to_model(raw, BrandAnalysis, None, agent=agent_for(adapter))
+    assert isinstance(result, BrandAnalysis)
+    stats = structured_output_stats()
+    assert (stats["structured_calls"], stats["validated"], stats["converter_reasks"]) == (1, 1, 0)
+
+
+def test_prose_output_is_counted_as_a_converter_reask(adapter):
+    result = convert_to_model(PROSE, BrandAnalysis, None, agent=agent_for(adapter))
+    assert isinstance(result, BrandAnalysis)
+    assert structured_output_stats()["converter_reasks"] == 1
+
+
+def test_ordinary_prompts_are_not_converter_calls():
+    assert not google_gemini_adapter.is_converter_call([{"role": "user", "content": "Format your final answer"}])
+    assert not google_gemini_adapter.is_converter_call("Format your final answer according to the schema")
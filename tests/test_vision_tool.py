@@ -0,0 +1,44 @@
+import time
+
+from PIL import Image, ImageDraw
+
+from tools.vision_tool import GeminiVisionTool
+
+
+def pattern(i: int) -> Image.Image:
+    """Distinct images: a bar at a different position for each `i`."""
+    img = Image.new("RGB", (200, 200), "white")
+    ImageDraw.Draw(img).rectangle([i * 30, 0, i * 30 + 25, 200], fill="black")
+    return img
+
+
+def candidates(n: int) -> list[dict]:
+    return [
+        {"url": f"https://cdn.example/img/product-{i}.png", "alt": "", "width": None,
+         "height": None, "position": i, "hints": ""}
+        for i in range(n)
+    ]
+
+
+def test_candidates_are_downloaded_concurrently(monkeypatch):
+    def slow_fetch(url):
+        time.sleep(0.3)
+        return pattern(int(url.rsplit("-", 1)[1].split(".")[0]))
+
+    monkeypatch.setattr(GeminiVisionTool, "_fetch_image", staticmethod(slow_fetch))
+    start = time.monotonic()
+    batch = GeminiVisionTool()._collect_batch(candidates(6), limit=2)
+    assert time.monotonic() - start < 0.9
+    assert [c["url"] for c, _ in batch] == [c["url"] for c in candidates(2)]
+
+
+def test_failed_and_duplicate_downloads_are_replaced(monkeypatch):
+    def fetch(url):
+        i = int(url.rsplit("-", 1)[1].split(".")[0])
+        if i == 0:
+            raise OSError("broken image")
+        return pattern(1 if i == 2 else i)  # candidate 2 duplicates candidate 1
+
+    monkeypatch.setattr(GeminiVisionTool, "_fetch_image", staticmethod(fetch))
+    batch = GeminiVisionTool()._collect_batch(candidates(6), limit=2)
+    assert [c["url"] for c, _ in batch] == [candidates(6)[1]["url"], candidates(6)[3]["url"]]
@@ -0,0 +1,198 @@
+# tools/http_fetch.py
+"""Shared HTTP fetch layer for the scraper and vision tools.
+
+- per-host latency tracking of successful responses; fast hosts get a
+  timeout derived from their p95, never longer than FETCH_DEFAULT_TIMEOUT,
+- hedged requests: a duplicate request is sent if the first one has not
+  answered within the host's typical latency, and the first response wins,
+- retries with backoff for connection errors, timeouts and 502/503/504,
+- a total time budget per fetch (FETCH_BUDGET) that hedges and retries must
+  fit inside, so a tarpitting host costs at most the budget,
+- an in-process DNS cache so repeated fetches skip name resolution.
+"""
+import os
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = (502, 503, 504)
+
+_dns_lock = threading.Lock()
+_dns_cache = {}
+_original_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(*args, **kwargs):
+    key = (args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_lock:
+        entry = _dns_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+    result = _original_getaddrinfo(*args, **kwargs)
+    ttl = float(os.getenv("DNS_CACHE_TTL", "300"))
+    with _dns_lock:
+        _dns_cache[key] = (now + ttl, result)
+    return result
+
+
+def install_dns_cache() -> None:
+    """Route socket.getaddrinfo through a TTL cache for the whole process (idempotent)."""
+    socket.getaddrinfo = _cached_getaddrinfo
+
+
+class HostLatencyTracker:
+    """Keeps a window of recent successful-response latencies per host."""
+
+    def __init__(self, window: int = 50, min_samples: int = 5, default_timeout: float = 10.0,
+                 min_timeout: float = 2.0, max_timeout: float | None = None, timeout_factor: float = 3.0):
+        self.window = window
+        self.min_samples = min_samples
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        # Adaptation only ever shortens the timeout for hosts known to be fast
+        self.max_timeout = default_timeout if max_timeout is None else max_timeout
+        self.timeout_factor = timeout_factor
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, host: str, latency: float) -> None:
+        with self._lock:
+            self._samples[host].append(latency)
+
+    def p95(self, host: str) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+
+    def timeout_for(self, host: str) -> float:
+        p95 = self.p95(host)
+        if p95 is None:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor))
+
+    def hedge_delay_for(self, host: str, default: float) -> float:
+        """Send the duplicate once a request is slower than this host's p95."""
+        p95 = self.p95(host)
+        return default if p95 is None else max(0.05, p95)
+
+
+class HedgedFetcher:
+    def __init__(self, retries: int = 2, hedge: bool = True, hedge_delay: float = 1.5,
+                 backoff: float = 0.5, budget: float = 15.0, max_workers: int = 16):
+        self.retries = retries
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.backoff = backoff
+        self.budget = budget
+        self.tracker = HostLatencyTracker(default_timeout=float(os.getenv("FETCH_DEFAULT_TIMEOUT", "10")))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self.stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "retries": 0, "budget_exceeded": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _timed_get(self, url: str, host: str, timeout: float, kwargs: dict) -> requests.Response:
+        start = time.perf_counter()
+        response = self.session.get(url, timeout=timeout, **kwargs)
+        # Only completed responses are samples; timeouts must not stretch the next timeout
+        self.tracker.record(host, time.perf_counter() - start)
+        return response
+
+    def _hedged_get(self, url: str, host: str, timeout: float, deadline: float, kwargs: dict) -> requests.Response:
+        self._count("requests")
+        primary = self._executor.submit(self._timed_get, url, host, timeout, kwargs)
+        pending = {primary}
+        if self.hedge:
+            delay = self.tracker.hedge_delay_for(host, self.hedge_delay)
+            done, _ = wait(pending, timeout=min(delay, max(0.0, deadline - time.monotonic())))
+            remaining = deadline - time.monotonic()
+            if not done and remaining > 0:
+                self._count("hedges")
+                pending.add(self._executor.submit(self._timed_get, url, host, min(timeout, remaining), kwargs))
+
+        error = None
+        while pending:
+            # Abandon requests still running at the deadline; their own timeouts end them
+            done, pending = wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                self._count("budget_exceeded")
+                raise requests.exceptions.Timeout(f"Fetching {url} exceeded the {self.budget:.1f}s budget")
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is not primary:
+                    self._count("hedge_wins")
+                return response
+        raise error
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET with adaptive timeout, hedging and retries; returns the response without raising on status."""
+        host = urlparse(url).hostname or ""
+        deadline = time.monotonic() + self.budget
+        last_error = last_response = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * (2 ** (attempt - 1))
+                # A retry that cannot get a useful timeout inside the budget is not worth starting
+                if deadline - time.monotonic() - delay < self.tracker.min_timeout:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+            timeout = min(self.tracker.timeout_for(host), deadline - time.monotonic())
+            try:
+                response = self._hedged_get(url, host, timeout, deadline, kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                last_error, last_response = None, response
+                continue
+            return response
+        # Out of retries or budget: a retryable status is still a response for the caller to judge
+        if last_error is None and last_response is not None:
+            return last_response
+        raise last_error
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> HedgedFetcher:
+    """Process-wide fetcher (and DNS cache) configured from FETCH_* environment variables."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            if os.getenv("DNS_CACHE", "1").lower() in ("1", "true", "yes"):
+                install_dns_cache()
+            _fetcher = HedgedFetcher(
+                retries=int(os.getenv("FETCH_RETRIES", "2")),
+                hedge=os.getenv("FETCH_HEDGE", "1").lower() in ("1", "true", "yes"),
+                hedge_delay=float(os.getenv("FETCH_HEDGE_DELAY", "1.5")),
+                budget=float(os.getenv("FETCH_BUDGET", "15")),
+            )
+        return _fetcher
+
+
+def fetch(url: str, **kwargs) -> requests.Response:
+    return get_fetcher().get(url, **kwargs)
@@ -0,0 +1,185 @@
+# tools/image_cache.py
+"""On-disk cache of vision analyses keyed by perceptual hash.
+
+Near-identical images (same hero served from another CDN URL, re-encoded or
+resized) hash to within a few bits of each other, so their stored description
+and palette can be reused without another Gemini call.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from tools.image_hashing import hamming_distance
+
+
+def extract_palette(img: Image.Image, count: int = 5) -> list[str]:
+    """Return the `count` most common colours as hex codes, using coarse RGB buckets."""
+    small = img.convert("RGB").resize((64, 64))
+    pixels = np.asarray(small, dtype=np.uint8).reshape(-1, 3)
+    # 4 bits per channel is enough to merge anti-aliasing and JPEG noise
+    buckets = (pixels >> 4).astype(np.int32)
+    keys = (buckets[:, 0] << 8) | (buckets[:, 1] << 4) | buckets[:, 2]
+    values, counts = np.unique(keys, return_counts=True)
+
+    palette = []
+    for key in values[np.argsort(counts)[::-1][:count]]:
+        members = pixels[keys == key]
+        r, g, b = members.mean(axis=0).astype(int)
+        palette.append(f"#{r:02x}{g:02x}{b:02x}")
+    return palette
+
+
+class ImageAnalysisCache:
+    """
+    Size-bounded (LRU) perceptual-hash cache persisted as a JSON index.
+    Several worker processes may share `cache_dir`: every save merges the
+    index on disk before writing it back atomically through a private temp file.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 500, threshold: int = 6,
+                 save_interval: float = 30.0):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.threshold = threshold
+        # Reads only touch `last_used`; they are persisted at most once per interval
+        self.save_interval = save_interval
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.metrics = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable vision cache index: {e}")
+            return {}
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k]["last_used"])
+            del self._entries[oldest]
+            self.metrics["evictions"] += 1
+
+    def _save(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Keep entries and recency that other processes wrote since this one loaded the index
+        for key, entry in self._load().items():
+            mine = self._entries.get(key)
+            if mine is None:
+                self._entries[key] = entry
+            else:
+                mine["last_used"] = max(mine["last_used"], entry["last_used"])
+        self._evict()
+
+        fd, tmp_path = tempfile.mkstemp(prefix="index.", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _save_quietly(self) -> None:
+        try:
+            self._save()
+        except Exception as e:
+            self._evict()
+            print(f"Could not persist vision cache: {e}")
+
+    @staticmethod
+    def _key(hashes: list[int]) -> str:
+        return "-".join(f"{h:016x}" for h in hashes)
+
+    def _matches(self, hashes: list[int], stored: list[str]) -> int | None:
+        """Total distance when every query hash has a near match in `stored`, else None."""
+        if len(hashes) != len(stored):
+            return None
+        stored_ints = [int(h, 16) for h in stored]
+        total = 0
+        for h in hashes:
+            best = min(hamming_distance(h, s) for s in stored_ints)
+            if best > self.threshold:
+                return None
+            total += best
+        return total
+
+    def get(self, hashes: list[int]) -> dict | None:
+        """Look up an analysis for a set of images, exact key first, then near matches."""
+        with self._lock:
+            entry = self._entries.get(self._key(hashes))
+            if entry is not None:
+                self.metrics["hits"] += 1
+            else:
+                best = None
+                for candidate in self._entries.values():
+                    distance = self._matches(hashes, candidate["hashes"])
+                    if distance is not None and (best is None or distance < best[0]):
+                        best = (distance, candidate)
+                if best is None:
+                    self.metrics["misses"] += 1
+                    return None
+                entry = best[1]
+                self.metrics["near_hits"] += 1
+
+            entry["last_used"] = time.time()
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= self.save_interval:
+                self._save_quietly()
+            return {"description": entry["description"], "palette": entry["palette"]}
+
+    def put(self, hashes: list[int], description: str, palette: list[str]) -> None:
+        with self._lock:
+            now = time.time()
+            self._entries[self._key(hashes)] = {
+                "hashes": [f"{h:016x}" for h in hashes],
+                "description": description,
+                "palette": palette,
+                "created": now,
+                "last_used": now,
+            }
+            # Evicts down to `max_entries` and persists `last_used` updates from earlier reads
+            self._save_quietly()
+
+    def flush(self) -> None:
+        """Persist pending `last_used` updates from reads."""
+        with self._lock:
+            if self._dirty:
+                self._save_quietly()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["near_hits"] + self.metrics["misses"]
+            hit_rate = (self.metrics["hits"] + self.metrics["near_hits"]) / lookups if lookups else 0.0
+            return {**self.metrics, "entries": len(self._entries), "hit_rate": round(hit_rate, 3)}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageAnalysisCache | None:
+    """Process-wide cache configured from the environment; None when VISION_CACHE=0."""
+    global _cache
+    if os.getenv("VISION_CACHE", "1").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageAnalysisCache(
+                cache_dir=os.getenv("VISION_CACHE_DIR", os.path.join(".cache", "vision")),
+                max_entries=int(os.getenv("VISION_CACHE_MAX_ENTRIES", "500")),
+            )
+        return _cache
@@ -0,0 +1,51 @@
+# tools/image_hashing.py
+"""Perceptual hashing helpers used to spot duplicate or near-identical images.
+
+Hashes are plain ints so they can be compared with `hamming_distance` and
+stored as hex strings.
+"""
+import numpy as np
+from PIL import Image
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int("".join("1" if b else "0" for b in bits.flatten()), 2)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2D DCT is `m @ x @ m.T`."""
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: compares horizontally adjacent pixels of a downscaled grayscale image."""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(img: Image.Image, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """Perceptual hash: thresholds the low-frequency DCT coefficients at their median.
+
+    More robust than `dhash` to re-encoding, rescaling and small colour shifts,
+    which makes it the better cache key.
+    """
+    size = hash_size * highfreq_factor
+    small = img.convert("L").resize((size, size), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    basis = _dct_matrix(size)
+    low = (basis @ pixels @ basis.T)[:hash_size, :hash_size]
+    return _bits_to_int(low > np.median(low))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def is_near_duplicate(a: int, b: int, threshold: int = 6) -> bool:
+    """True when two hashes are within `threshold` bits of each other."""
+    return hamming_distance(a, b) <= threshold
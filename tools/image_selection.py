@@ -0,0 +1,106 @@
+# tools/image_selection.py
+"""Cheap local heuristics for picking the most informative images on a page.
+
+Candidates come from `WebsiteScraperTool` as dicts with `url`, `alt`,
+`width`, `height`, `position` and `hints` (image and parent class/id text).
+Keywords are matched against whole tokens of the URL path, alt text and hints,
+never against the host name or as substrings ("wrapper" is not "app").
+"""
+import re
+from urllib.parse import urlparse
+
+LOGO_KEYWORDS = ("logo", "brand", "wordmark")
+HERO_KEYWORDS = ("hero", "banner", "cover", "masthead", "splash", "jumbotron")
+PRODUCT_KEYWORDS = ("product", "screenshot", "feature", "showcase", "app", "dashboard")
+NOISE_KEYWORDS = ("icon", "favicon", "sprite", "pixel", "tracking", "spacer", "avatar", "badge", "emoji", "1x1", "blank")
+
+# Formats PIL cannot decode (or that carry little brand signal) are pushed down the ranking
+UNSUPPORTED_EXTENSIONS = (".svg", ".ico")
+
+
+def _to_int(value) -> int | None:
+    try:
+        return int(re.sub(r"[^0-9]", "", str(value))) if value else None
+    except ValueError:
+        return None
+
+
+def _tokens(candidate: dict) -> set[str]:
+    """Lower-cased word tokens of the URL path, alt text and class/id hints."""
+    text = " ".join([
+        urlparse(candidate.get("url") or "").path,
+        str(candidate.get("alt") or ""),
+        str(candidate.get("hints") or ""),
+    ])
+    # Split camelCase before lower-casing so "heroImage" yields "hero"
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text).lower()
+    tokens = set(re.findall(r"[a-z0-9]+", text))
+    # Match simple plurals ("logos", "screenshots") against the singular keywords
+    return tokens | {t[:-1] for t in tokens if len(t) > 3 and t.endswith("s")}
+
+
+def _matches(tokens: set[str], keywords: tuple[str, ...]) -> bool:
+    return not tokens.isdisjoint(keywords)
+
+
+def classify_image(candidate: dict) -> str:
+    """Label a candidate as 'logo', 'hero', 'product' or 'other' from its text signals."""
+    tokens = _tokens(candidate)
+    if _matches(tokens, LOGO_KEYWORDS):
+        return "logo"
+    if _matches(tokens, HERO_KEYWORDS):
+        return "hero"
+    if _matches(tokens, PRODUCT_KEYWORDS):
+        return "product"
+    return "other"
+
+
+def score_image_candidate(candidate: dict) -> float:
+    """Score a candidate using size, position, alt text and filename."""
+    url = candidate.get("url") or ""
+    if not url or url.startswith("data:"):
+        return float("-inf")
+
+    path = urlparse(url).path.lower()
+    score = 0.0
+
+    kind = classify_image(candidate)
+    score += {"logo": 3.0, "hero": 2.5, "product": 1.5}.get(kind, 0.0)
+
+    if _matches(_tokens(candidate), NOISE_KEYWORDS):
+        score -= 3.0
+    if path.endswith(UNSUPPORTED_EXTENSIONS):
+        score -= 2.0
+
+    width, height = _to_int(candidate.get("width")), _to_int(candidate.get("height"))
+    if width and height:
+        if width <= 32 or height <= 32:
+            score -= 3.0
+        elif width >= 300 and height >= 200:
+            score += 2.0
+        else:
+            score += min(width * height / (300 * 200), 1.0)
+
+    if candidate.get("alt"):
+        score += 0.5
+
+    # Images near the top of the document are more likely to be brand-defining
+    position = candidate.get("position", 0) or 0
+    score += 1.5 * max(0.0, 1.0 - position / 10)
+
+    return score
+
+
+def select_images(candidates: list[dict], limit: int) -> list[dict]:
+    """Return up to `limit` candidates ordered by score, skipping duplicate URLs."""
+    seen = set()
+    ranked = []
+    for candidate in sorted(candidates, key=score_image_candidate, reverse=True):
+        url = candidate.get("url")
+        if url in seen or score_image_candidate(candidate) == float("-inf"):
+            continue
+        seen.add(url)
+        ranked.append({**candidate, "kind": classify_image(candidate)})
+        if len(ranked) >= limit:
+            break
+    return ranked
@@ -0,0 +1,174 @@
+# tools/render_pool.py
+"""Pool of warm headless Chrome sessions for rendering JS-heavy pages.
+
+Only used by `WebsiteScraperTool` when the static fetch yields too little text
+(typical for SPA sites). Drivers are created lazily, reused across requests and
+shut down at interpreter exit, so browser startup is paid once per worker.
+"""
+import atexit
+import os
+import threading
+import time
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.support.ui import WebDriverWait
+except Exception:
+    webdriver = None
+
+# Fonts, media and common trackers add load time without adding text content
+DEFAULT_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*segment.io*", "*segment.com*",
+    "*mixpanel.com*", "*intercom.io*", "*hubspot.com*",
+]
+
+
+class BrowserRenderPool:
+    """Fixed-size pool of long-lived headless Chrome drivers."""
+
+    def __init__(self, size: int = 2, page_timeout: float = 15.0, settle_timeout: float = 3.0,
+                 blocked_urls: list[str] | None = None):
+        if webdriver is None:
+            raise RuntimeError("selenium library not installed")
+        self.size = size
+        self.page_timeout = page_timeout
+        self.settle_timeout = settle_timeout
+        self.blocked_urls = blocked_urls if blocked_urls is not None else DEFAULT_BLOCKED_URLS
+        self._idle = []
+        self._created = 0
+        # Signalled whenever a driver is returned or pool capacity is freed
+        self._available = threading.Condition()
+        self._closed = False
+
+    def _create_driver(self):
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1366,900")
+        # Keep <img> src attributes in the DOM but skip downloading the bytes
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+        # Return once the DOM is ready instead of waiting for every subresource
+        options.page_load_strategy = "eager"
+
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_timeout)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except Exception as e:
+            print(f"Resource blocking unavailable: {e}")
+        return driver
+
+    def _acquire(self):
+        """An idle driver, a new one if the pool is below `size`, or wait up to `page_timeout`."""
+        deadline = time.monotonic() + self.page_timeout
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser became available within {self.page_timeout:.0f}s")
+                self._available.wait(remaining)
+
+        # Browser startup is slow; do it outside the lock so releases are not blocked
+        try:
+            return self._create_driver()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, driver, healthy: bool = True) -> None:
+        with self._available:
+            if healthy and not self._closed:
+                self._idle.append(driver)
+                self._available.notify()
+                return
+            # Freed capacity lets a waiting caller start a replacement driver
+            self._created -= 1
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def render(self, url: str, min_text_chars: int = 0) -> str:
+        """
+        Loads `url` in a pooled browser and returns the rendered HTML.
+        Waits up to `settle_timeout` seconds for the body text to reach
+        `min_text_chars` so client-side rendering has a chance to finish.
+        """
+        driver = self._acquire()
+        healthy = True
+        start = time.perf_counter()
+        try:
+            try:
+                driver.get(url)
+            except Exception as e:
+                # A page-level timeout still leaves whatever has rendered so far
+                if "timeout" not in str(e).lower():
+                    raise
+                driver.execute_script("window.stop();")
+
+            if min_text_chars:
+                try:
+                    WebDriverWait(driver, self.settle_timeout).until(
+                        lambda d: len(d.execute_script("return document.body ? document.body.innerText : ''") or "")
+                        >= min_text_chars
+                    )
+                except Exception:
+                    pass
+
+            html = driver.page_source
+            print(f"Rendered {url} in {time.perf_counter() - start:.2f}s")
+            return html
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                try:
+                    driver.get("about:blank")
+                except Exception:
+                    healthy = False
+            self._release(driver, healthy)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            drivers, self._idle = self._idle, []
+            self._created -= len(drivers)
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> BrowserRenderPool:
+    """Process-wide pool configured from RENDER_POOL_SIZE and RENDER_PAGE_TIMEOUT."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserRenderPool(
+                size=int(os.getenv("RENDER_POOL_SIZE", "2")),
+                page_timeout=float(os.getenv("RENDER_PAGE_TIMEOUT", "15")),
+            )
+            atexit.register(_pool.close)
+        return _pool
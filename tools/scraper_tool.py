@@ -1,13 +1,127 @@
 # tools/scraper_tool.py
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
 from urllib.parse import urljoin
+import os
 from crewai.tools.base_tool import BaseTool
 
+from tools.http_fetch import fetch
+
+
+def _render_enabled() -> bool:
+    return os.getenv("ENABLE_JS_RENDER", "0").lower() in ("1", "true", "yes")
+
+
+def _render_min_text_chars() -> int:
+    return int(os.getenv("RENDER_MIN_TEXT_CHARS", "500"))
+
+
+def _max_text_chars() -> int:
+    """Cap on text handed to a single prompt (0 = unlimited); truncation is flagged in the output."""
+    return int(os.getenv("SCRAPER_MAX_CHARS", "8000"))
+
+# Elements that start a new line when rendered; everything else flows inline
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "dd", "details", "dialog", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hgroup", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "summary",
+    "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul", "body", "html", "title",
+    "option", "caption", "legend",
+})
+_NON_TEXT = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+
+def _visible_text(soup) -> str:
+    """
+    Text as a browser lays it out: inline runs (links, <b>, <span>...) are joined
+    with their surrounding whitespace collapsed, and lines break only at block
+    elements and <br>, so each line is a paragraph, list item or heading.
+    """
+    lines, current = [], []
+
+    def flush():
+        line = " ".join("".join(current).split())
+        if line:
+            lines.append(line)
+        current.clear()
+
+    # Iterative walk: deeply nested markup would exhaust the recursion limit
+    stack = [(soup, False)]
+    while stack:
+        node, leaving = stack.pop()
+        if leaving:
+            flush()
+            continue
+        if isinstance(node, NavigableString):
+            if not isinstance(node, _NON_TEXT):
+                current.append(str(node))
+            continue
+        if node.name == "br":
+            flush()
+            continue
+        block = node.name in BLOCK_TAGS
+        if block:
+            flush()
+            stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.contents))
+    flush()
+    return "\n".join(lines)
+
+
 class WebsiteScraperTool(BaseTool):
     # Pydantic v2 requires annotated overrides of model fields
     name: str = "website_scraper"
     description: str = "Scrapes a website and returns its text content and main image URL."
+    # None applies SCRAPER_MAX_CHARS; the crew passes 0 when long text is chunked downstream
+    max_text_chars: int | None = None
+    # Direct callers get an {"error": ...} dict; agent-driven scrapes raise so that
+    # tool_failure_policy="raise" aborts the crew instead of the agent improvising
+    raise_on_error: bool = False
+
+    @staticmethod
+    def _image_candidates(soup, url: str, limit: int = 40) -> list[dict]:
+        """
+        Collects <img> tags with the metadata the vision heuristics rank on.
+        """
+        candidates = []
+        for position, img in enumerate(soup.find_all('img')):
+            src = img.get('src') or img.get('data-src')
+            if not src:
+                continue
+            parent = img.parent
+            hints = " ".join(
+                filter(None, [
+                    " ".join(img.get('class') or []),
+                    img.get('id'),
+                    # Parent class/id only: wrapper tags like <header>/<main> say nothing about the image
+                    " ".join(parent.get('class') or []) if parent else None,
+                    parent.get('id') if parent else None,
+                ])
+            )
+            candidates.append({
+                "url": urljoin(url, src),
+                "alt": img.get('alt', ''),
+                "width": img.get('width'),
+                "height": img.get('height'),
+                "position": position,
+                "hints": hints,
+            })
+            if len(candidates) >= limit:
+                break
+        return candidates
+
+    def _parse(self, html: str, url: str) -> dict:
+        """
+        Extracts visible text and image candidates from an HTML document.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        for s in soup(["script", "style", "noscript"]):
+            s.extract()
+
+        candidates = self._image_candidates(soup, url)
+        # One block per line keeps section boundaries for downstream chunking
+        text = _visible_text(soup)
+        return {"text": text, "candidates": candidates}
 
     def _run(self, url: str) -> dict:
         """
@@ -15,19 +129,43 @@ class WebsiteScraperTool(BaseTool):
         """
         try:
             headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = fetch(url, headers=headers)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            for s in soup(["script", "style"]):
-                s.extract()
+            parsed = self._parse(response.text, url)
+            rendered = False
+
+            # SPA shells carry almost no server-rendered text; escalate to a real browser
+            min_chars = _render_min_text_chars()
+            if _render_enabled() and len(parsed["text"]) < min_chars:
+                try:
+                    from tools.render_pool import get_render_pool
+
+                    html = get_render_pool().render(url, min_text_chars=min_chars)
+                    rendered_parsed = self._parse(html, url)
+                    if len(rendered_parsed["text"]) > len(parsed["text"]):
+                        parsed, rendered = rendered_parsed, True
+                except Exception as e:
+                    print(f"JS rendering failed for {url}, using static HTML: {e}")
 
-            text = " ".join(soup.stripped_strings)[:8000]
-            images = [urljoin(url, img.get('src')) for img in soup.find_all('img') if img.get('src')]
-            hero_image = images[0] if images else None
+            # Agents get a bounded page; the map-reduce path asks for the full text. Truncation is reported
+            text = parsed["text"]
+            max_chars = _max_text_chars() if self.max_text_chars is None else self.max_text_chars
+            truncated = bool(max_chars) and len(text) > max_chars
+            candidates = parsed["candidates"]
+            hero_image = candidates[0]["url"] if candidates else None
 
-            return {"text_content": text, "hero_image_url": hero_image}
+            return {
+                "text_content": text[:max_chars] if truncated else text,
+                "text_length": len(text),
+                "text_truncated": truncated,
+                "hero_image_url": hero_image,
+                "image_candidates": candidates,
+                "rendered": rendered,
+            }
         except Exception as e:
+            if self.raise_on_error:
+                raise
             return {"error": str(e)}
 
     async def _arun(self, url: str) -> dict:
@@ -1,11 +1,52 @@
 # tools/vision_tool.py (FINAL FIXED VERSION)
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from PIL import Image
-import google.generativeai as genai
+from typing import TYPE_CHECKING
 from crewai.tools.base_tool import BaseTool
 
+from tools.http_fetch import fetch
+from tools.image_selection import select_images
+
+# PIL, NumPy (hashing/cache) and genai are imported inside the methods that use
+# them, so attaching this tool to an agent does not load the vision stack.
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+BRAND_PROMPT = (
+    "You are a professional brand strategist. Analyze this image and describe:\n"
+    "1. Primary colors (with hex codes)\n"
+    "2. Secondary colors\n"
+    "3. Design style (modern, minimal, luxurious, etc.)\n"
+    "4. Emotional tone (trust, innovation, calm, etc.)\n"
+    "5. Any logo or icon elements\n"
+    "Provide a concise yet elegant branding summary."
+)
+
+BATCH_PROMPT = (
+    "You are a professional brand strategist. The following images come from the same "
+    "company website (logo, hero and product imagery). Considering them together, describe:\n"
+    "1. Primary colors (with hex codes)\n"
+    "2. Secondary colors\n"
+    "3. Design style (modern, minimal, luxurious, etc.)\n"
+    "4. Emotional tone (trust, innovation, calm, etc.)\n"
+    "5. Logo or icon elements\n"
+    "Provide one concise yet elegant branding summary covering all images."
+)
+
+# Images are downscaled before upload; brand analysis does not need full resolution
+MAX_UPLOAD_SIDE = 1024
+MIN_IMAGE_SIDE = 48
+MAX_PARALLEL_DOWNLOADS = 6
+
+
+def _max_images() -> int:
+    try:
+        return max(1, int(os.getenv("VISION_MAX_IMAGES", "3")))
+    except ValueError:
+        return 3
+
 
 class GeminiVisionTool(BaseTool):
     # Annotate fields so Pydantic v2 recognizes these as field overrides
@@ -15,12 +56,99 @@ class GeminiVisionTool(BaseTool):
         "its visual branding elements such as colors, design style, and emotional tone."
     )
 
-    def _run(self, image_url: str) -> str:
+    @staticmethod
+    def _fetch_image(image_url: str) -> "Image.Image":
+        from PIL import Image
+
+        response = fetch(image_url)
+        response.raise_for_status()
+        img = Image.open(BytesIO(response.content))
+        img.load()
+        return img
+
+    def _collect_batch(self, image_candidates: list[dict], limit: int) -> list[tuple[dict, "Image.Image"]]:
+        """
+        Downloads the highest-ranked candidates concurrently and drops
+        near-duplicates by perceptual hash until `limit` distinct images are
+        collected. Results are consumed in rank order, so the whole step takes
+        about one fetch budget instead of one per candidate.
+        """
+        from tools.image_hashing import dhash, is_near_duplicate
+
+        # Over-select so duplicates and broken images can be replaced
+        ranked = select_images(image_candidates, limit * 3)
+        selected = []
+        hashes = []
+        if not ranked:
+            return selected
+
+        # A private pool: the fetcher's own executor runs the hedged requests these downloads wait on
+        executor = ThreadPoolExecutor(max_workers=min(len(ranked), MAX_PARALLEL_DOWNLOADS),
+                                      thread_name_prefix="vision-fetch")
+        try:
+            futures = [(candidate, executor.submit(self._fetch_image, candidate["url"])) for candidate in ranked]
+            for candidate, future in futures:
+                try:
+                    img = future.result()
+                except Exception as e:
+                    print(f"Skipping image {candidate['url']}: {e}")
+                    continue
+                if min(img.size) < MIN_IMAGE_SIDE:
+                    continue
+
+                img_hash = dhash(img)
+                if any(is_near_duplicate(img_hash, h) for h in hashes):
+                    continue
+
+                hashes.append(img_hash)
+                img = img.convert("RGB")
+                img.thumbnail((MAX_UPLOAD_SIDE, MAX_UPLOAD_SIDE))
+                selected.append((candidate, img))
+                if len(selected) >= limit:
+                    break
+        finally:
+            # Downloads still queued are not needed once enough distinct images are in
+            executor.shutdown(wait=False, cancel_futures=True)
+        return selected
+
+    @staticmethod
+    def _generate(model, contents: list) -> str:
+        """Single Gemini Vision round-trip; the seam the cassette layer records and replays."""
+        return model.generate_content(contents).text
+
+    @staticmethod
+    def _analyze(model, contents: list, images: list["Image.Image"]) -> str:
+        """
+        Returns the branding description for `images`, reusing a cached analysis
+        of perceptually identical images when available.
+        """
+        from tools.image_cache import extract_palette, get_image_cache
+        from tools.image_hashing import phash
+
+        cache = get_image_cache()
+        hashes = [phash(img) for img in images]
+        cached = cache.get(hashes) if cache else None
+        if cached:
+            description, palette = cached["description"], cached["palette"]
+        else:
+            description = GeminiVisionTool._generate(model, contents).strip()
+            palette = extract_palette(images[0])
+            if cache:
+                cache.put(hashes, description, palette)
+
+        if cache:
+            cache.flush()
+            print(f"Vision cache: {cache.stats()}")
+        return f"{description}\n\nMeasured dominant palette: {', '.join(palette)}"
+
+    def _run(self, image_url: str = "", image_candidates: list[dict] | None = None) -> str:
         """
         Runs Gemini Pro Vision to analyze the given image URL.
+        When `image_candidates` (from the scraper) are supplied, the most
+        informative distinct images are analyzed together in one request.
         Returns a professional, detailed visual branding description.
         """
-        if not image_url:
+        if not image_url and not image_candidates:
             return "⚠️ No image URL provided."
 
         api_key = os.getenv("GOOGLE_API_KEY")
@@ -28,34 +156,38 @@ class GeminiVisionTool(BaseTool):
             return "❌ Missing GOOGLE_API_KEY environment variable."
 
         try:
+            import google.generativeai as genai
+
             # Configure Gemini
             genai.configure(api_key=api_key)
             model = genai.GenerativeModel("gemini-pro-vision")
 
+            if image_candidates:
+                batch = self._collect_batch(image_candidates, _max_images())
+                if batch:
+                    contents = [BATCH_PROMPT]
+                    for i, (candidate, img) in enumerate(batch, start=1):
+                        label = f"Image {i} ({candidate['kind']}"
+                        if candidate.get("alt"):
+                            label += f", alt text: {candidate['alt']}"
+                        contents.extend([label + "):", img])
+
+                    return self._analyze(model, contents, [img for _, img in batch])
+
+                if not image_url:
+                    return "⚠️ None of the candidate images could be loaded."
+
             # Fetch image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
+            img = self._fetch_image(image_url)
 
             # Open and analyze
-            img = Image.open(BytesIO(response.content))
-            prompt = (
-                "You are a professional brand strategist. Analyze this image and describe:\n"
-                "1. Primary colors (with hex codes)\n"
-                "2. Secondary colors\n"
-                "3. Design style (modern, minimal, luxurious, etc.)\n"
-                "4. Emotional tone (trust, innovation, calm, etc.)\n"
-                "5. Any logo or icon elements\n"
-                "Provide a concise yet elegant branding summary."
-            )
-
-            result = model.generate_content([prompt, img])
-            return result.text.strip()
+            return self._analyze(model, [BRAND_PROMPT, img], [img])
 
         except Exception as e:
             return f"❌ Error analyzing image: {str(e)}"
 
-    async def _arun(self, image_url: str) -> str:
+    async def _arun(self, image_url: str = "", image_candidates: list[dict] | None = None) -> str:
         """
         Async version of the tool.
         """
-        return self._run(image_url)
+        return self._run(image_url, image_candidates)
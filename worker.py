@@ -0,0 +1,115 @@
+# worker.py (Distributed analysis worker)
+"""Pulls analysis jobs from the queue, runs the crew and writes results back.
+
+Run as many of these as needed, on one machine or many, pointing at the same
+JOB_QUEUE_URL:
+
+    python worker.py                                   # SQLite queue, 1 thread
+    python worker.py --queue redis://cache:6379/0 --concurrency 4
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from job_queue import JobQueue, get_job_queue
+from report_store import get_report_store
+
+
+class AnalysisWorker:
+    """Claims one job at a time and keeps its lease alive with heartbeats while the crew runs."""
+
+    def __init__(self, queue: JobQueue, worker_id: str | None = None, visibility_timeout: float | None = None,
+                 heartbeat_interval: float | None = None, poll_interval: float = 2):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.visibility_timeout = visibility_timeout or float(os.getenv("JOB_VISIBILITY_TIMEOUT", "600"))
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+        self.poll_interval = poll_interval
+
+    def _heartbeat_loop(self, job_id: str, done: threading.Event) -> None:
+        while not done.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(job_id, self.worker_id, self.visibility_timeout):
+                print(f"[{self.worker_id}] Lost lease on job {job_id}; another worker may pick it up.")
+                return
+
+    def process_one(self) -> bool:
+        """Run a single job if one is available; returns False when the queue was empty."""
+        job = self.queue.claim(self.worker_id, self.visibility_timeout)
+        if job is None:
+            return False
+
+        job_id, payload = job["id"], job["payload"]
+        print(f"[{self.worker_id}] Running job {job_id} (attempt {job['attempts']}): {payload}")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(job_id, done), daemon=True)
+        heartbeat.start()
+        try:
+            from crew import CompetitorAnalysisCrew, report_to_dict
+
+            crew_instance = CompetitorAnalysisCrew()
+            result = crew_instance.run(payload["company_name"], payload["company_url"])
+            if not result:
+                error = crew_instance.last_error or "Crew execution failed to produce a report."
+                self.queue.fail(job_id, self.worker_id, str(error))
+            else:
+                report = report_to_dict(result)
+                if self.queue.complete(job_id, self.worker_id, report):
+                    # Keyed by job id, so a re-delivered job never stores the report twice
+                    get_report_store().save(report, payload["company_name"], payload["company_url"], job_id)
+                else:
+                    print(f"[{self.worker_id}] Job {job_id} was already completed; result discarded.")
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.fail(job_id, self.worker_id, str(e))
+        finally:
+            done.set()
+            heartbeat.join()
+        return True
+
+    def run_forever(self, stop: threading.Event | None = None) -> None:
+        stop = stop or threading.Event()
+        print(f"[{self.worker_id}] Worker started.")
+        while not stop.is_set():
+            try:
+                if not self.process_one():
+                    stop.wait(self.poll_interval)
+            except Exception as e:
+                # Queue outages should not kill the worker; back off and retry
+                print(f"[{self.worker_id}] Queue error: {e}")
+                stop.wait(self.poll_interval)
+
+
+def start_worker_threads(count: int, queue: JobQueue | None = None, **kwargs) -> threading.Event:
+    """Start `count` daemon worker threads; set the returned event to stop them."""
+    stop = threading.Event()
+    queue = queue or get_job_queue()
+    for _ in range(count):
+        worker = AnalysisWorker(queue, **kwargs)
+        threading.Thread(target=worker.run_forever, args=(stop,), daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Competitor analysis worker")
+    parser.add_argument("--queue", default=None, help="Queue URL (default: JOB_QUEUE_URL or SQLite)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "1")))
+    parser.add_argument("--visibility-timeout", type=float, default=None, help="Default: JOB_VISIBILITY_TIMEOUT or 600")
+    parser.add_argument("--heartbeat-interval", type=float, default=None, help="Default: JOB_HEARTBEAT_INTERVAL or 30")
+    args = parser.parse_args()
+
+    stop_event = start_worker_threads(
+        args.concurrency,
+        queue=get_job_queue(args.queue),
+        visibility_timeout=args.visibility_timeout,
+        heartbeat_interval=args.heartbeat_interval,
+    )
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping workers; unfinished jobs are re-delivered after their visibility timeout.")
+        stop_event.set()